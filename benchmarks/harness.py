@@ -0,0 +1,289 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import traceback
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# Repo root on the path: the harness runs the engines from inside its work directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import SyntheticDataGenerator
+from benchmarks.stubs import TinySentimentModel
+from src.monitoring.metrics import METRICS
+
+logger = logging.getLogger("Benchmarks")
+
+# Bump whenever the result record layout changes
+SCHEMA_VERSION = 1
+ENGINES = ["credit", "sentiment", "systemic", "fusion", "pipeline"]
+
+class BenchmarkHarness:
+    """
+    Times every engine and the full pipeline on seeded synthetic data.
+
+    Each size gets its own work directory (data/processed, models, configs copied
+    from the repo, caches and outputs), and the engines run with it as the working
+    directory, so nothing touches the repo's own data. Caches are cleared before
+    every repeat: all timings are cold runs. Stage breakdowns come from the
+    monitoring registry, which is enabled for the duration of the run.
+    """
+
+    def __init__(self, workdir: str, seed: int = 42, repeats: int = 3, edges_per_entity: float = 5.0,
+                 headlines_per_entity: float = 2.0, sentiment_model: str = "stub", pipeline_mode: str = "columnar"):
+        self.workdir = os.path.abspath(workdir)
+        self.seed = seed
+        self.repeats = repeats
+        self.edges_per_entity = edges_per_entity
+        self.headlines_per_entity = headlines_per_entity
+        self.sentiment_model = sentiment_model
+        self.pipeline_mode = pipeline_mode
+        self.generator = SyntheticDataGenerator(seed)
+        self._analyzer = None
+
+    # --- Setup ---------------------------------------------------------------
+
+    def _prepare(self, n: int) -> str:
+        """Creates (once) and enters the work directory for size n."""
+        size_dir = os.path.join(self.workdir, f"n{n}_seed{self.seed}")
+        data_dir = os.path.join(size_dir, "data", "processed")
+        if not os.path.exists(os.path.join(data_dir, "news_mapped.csv")):
+            self.generator.write_dataset(data_dir, n, self.edges_per_entity, self.headlines_per_entity)
+
+        os.makedirs(os.path.join(size_dir, "models"), exist_ok=True)
+        shutil.copytree(os.path.join(ROOT, "configs"), os.path.join(size_dir, "configs"), dirs_exist_ok=True)
+        fusion_model = os.path.join(ROOT, "models", "meta_fusion_model.npz")
+        if os.path.exists(fusion_model):
+            shutil.copy2(fusion_model, os.path.join(size_dir, "models"))
+        os.chdir(size_dir)
+        return size_dir
+
+    @staticmethod
+    def _clear_state():
+        for path in ("data/cache", "outputs"):
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _analyzer_instance(self):
+        if self._analyzer is None:
+            if self.sentiment_model == "finbert":
+                from src.sentiment_risk.finbert_inference import FinBERTAnalyzer
+                self._analyzer = FinBERTAnalyzer()
+            else:
+                self._analyzer = TinySentimentModel(seed=self.seed)
+        return self._analyzer
+
+    def _credit_frame(self):
+        import pandas as pd
+        return pd.read_csv("data/processed/credit_clean.csv").set_index("entity_id")
+
+    def _train_credit_model(self, df) -> str:
+        """Small XGBoost model on the synthetic labels (untimed setup)."""
+        import xgboost as xgb
+        from src.credit_risk.features import CreditFeatureEngineer
+
+        path = "models/credit_model.json"
+        if not os.path.exists(path):
+            features = CreditFeatureEngineer.prepare_for_training(df)
+            booster = xgb.train(
+                {"objective": "binary:logistic", "max_depth": 4, "eta": 0.1, "seed": self.seed},
+                xgb.DMatrix(features, label=df["is_default"]), num_boost_round=100
+            )
+            booster.save_model(path)
+        return path
+
+    # --- Timing --------------------------------------------------------------
+
+    def _measure(self, engine: str, n: int, items: int, run: Callable, setup: Optional[Callable] = None) -> Dict:
+        seconds = []
+        METRICS.reset()
+        for _ in range(self.repeats):
+            self._clear_state()
+            args = setup() if setup else None
+            start = time.perf_counter()
+            run(args) if setup else run()
+            seconds.append(time.perf_counter() - start)
+
+        median = statistics.median(seconds)
+        stages = {name: {k: s[k] for k in ("calls", "items", "total_seconds", "mean_seconds")}
+                  for name, s in METRICS.snapshot()["stages"].items()}
+        return {
+            "engine": engine,
+            "size": n,
+            "items": items,
+            "repeats": self.repeats,
+            "seconds": [round(s, 6) for s in seconds],
+            "min_seconds": round(min(seconds), 6),
+            "median_seconds": round(median, 6),
+            "items_per_second": round(items / median, 2) if median > 0 else None,
+            "stages": stages
+        }
+
+    # --- Engines -------------------------------------------------------------
+
+    def bench_credit(self, n: int) -> Dict:
+        from src.credit_risk.engine import CreditRiskEngine
+
+        df = self._credit_frame()
+        engine = CreditRiskEngine(model_path=self._train_credit_model(df))
+        return self._measure("credit", n, len(df), lambda: engine.analyze_many(df))
+
+    def bench_sentiment(self, n: int) -> Dict:
+        from src.sentiment_risk.engine import SentimentRiskEngine
+        from src.sentiment_risk.news_loader import NewsLoader
+        from src.sentiment_risk.score_cache import SentimentScoreCache
+
+        ids = list(SyntheticDataGenerator.entity_ids(n))
+        loader = NewsLoader(data_path="data/processed/news_mapped.csv")
+        model_name = "ProsusAI/finbert" if self.sentiment_model == "finbert" else "benchmark-stub"
+
+        def setup():
+            return SentimentRiskEngine(analyzer=self._analyzer_instance(), loader=loader,
+                                       cache=SentimentScoreCache(model_name=model_name))
+        return self._measure("sentiment", n, n, lambda engine: engine.analyze_many(ids), setup)
+
+    def bench_systemic(self, n: int) -> Dict:
+        from src.systemic_risk.engine import SystemicRiskEngine
+
+        ids = list(SyntheticDataGenerator.entity_ids(n))
+
+        def run():
+            engine = SystemicRiskEngine()
+            engine.ingest_data("data/processed/network_mapped.csv")
+            engine.score_many(ids)
+        return self._measure("systemic", n, n, run)
+
+    def bench_fusion(self, n: int) -> Dict:
+        from src.aggregation.fusion_engine import RiskFusionEngine
+
+        ids = list(SyntheticDataGenerator.entity_ids(n))
+        matrix = np.random.default_rng(self.seed).uniform(0.0, 100.0, size=(n, 3))
+        engine = RiskFusionEngine(use_ml_model=True, model_path="models/meta_fusion_model.pkl")
+        return self._measure("fusion", n, n, lambda: engine.aggregate_many(ids, matrix))
+
+    def bench_pipeline(self, n: int) -> Dict:
+        self._train_credit_model(self._credit_frame())
+        from main import SentinAL
+        from run_full_analysis import run_pipeline
+
+        def setup():
+            return SentinAL(sentiment_analyzer=self._analyzer_instance())
+        return self._measure("pipeline", n, n, lambda app: run_pipeline(mode=self.pipeline_mode, app=app), setup)
+
+    # --- Driver --------------------------------------------------------------
+
+    def run(self, sizes: List[int], engines: List[str]) -> Dict:
+        cwd = os.getcwd()
+        was_enabled = METRICS.enabled
+        METRICS.enable()
+        results = []
+        try:
+            for n in sizes:
+                for engine in engines:
+                    self._prepare(n)
+                    logger.info(f"⏱️ Benchmarking {engine} at n={n}...")
+                    try:
+                        result = getattr(self, f"bench_{engine}")(n)
+                        logger.info(f"✅ {engine} n={n}: median {result['median_seconds']:.3f}s "
+                                    f"({result['items_per_second']} items/s)")
+                    except Exception as e:
+                        logger.error(f"❌ {engine} n={n} failed: {e}")
+                        result = {"engine": engine, "size": n, "error": f"{type(e).__name__}: {e}",
+                                  "traceback": traceback.format_exc()}
+                    results.append(result)
+        finally:
+            os.chdir(cwd)
+            METRICS.enable(was_enabled)
+
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "created_at": datetime.now().isoformat(),
+            "environment": environment_info(),
+            "settings": {
+                "seed": self.seed,
+                "repeats": self.repeats,
+                "edges_per_entity": self.edges_per_entity,
+                "headlines_per_entity": self.headlines_per_entity,
+                "sentiment_model": self.sentiment_model,
+                "pipeline_mode": self.pipeline_mode
+            },
+            "results": results
+        }
+
+def environment_info() -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+def save_report(report: Dict, path: str):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, path)
+
+def compare_reports(baseline: Dict, candidate: Dict) -> List[str]:
+    """One line per (engine, size) present in both reports: median seconds and speedup."""
+    def medians(report):
+        return {(r["engine"], r["size"]): r["median_seconds"] for r in report["results"] if "median_seconds" in r}
+
+    before, after = medians(baseline), medians(candidate)
+    lines = [f"{'engine':<10} {'size':>10} {'before (s)':>12} {'after (s)':>12} {'speedup':>9}"]
+    for key in sorted(before.keys() & after.keys(), key=lambda k: (ENGINES.index(k[0]), k[1])):
+        b, a = before[key], after[key]
+        speedup = f"{b / a:.2f}x" if a > 0 else "n/a"
+        lines.append(f"{key[0]:<10} {key[1]:>10} {b:>12.4f} {a:>12.4f} {speedup:>9}")
+    return lines
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SentinAL synthetic-scale benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000], help="Entity counts, e.g. 10000 100000 1000000")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=ENGINES)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--edges-per-entity", type=float, default=5.0)
+    parser.add_argument("--headlines-per-entity", type=float, default=2.0)
+    parser.add_argument("--sentiment-model", choices=["stub", "finbert"], default="stub",
+                        help="stub: tiny deterministic model (no torch needed); finbert: the real model")
+    parser.add_argument("--pipeline-mode", choices=["batch", "columnar"], default="columnar")
+    parser.add_argument("--workdir", default=os.path.join(ROOT, "benchmarks", "work"))
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"),
+                        help="Print the speedup table between two result files and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logger.setLevel(logging.INFO)
+
+    if args.compare:
+        with open(args.compare[0]) as f_base, open(args.compare[1]) as f_new:
+            print("\n".join(compare_reports(json.load(f_base), json.load(f_new))))
+        sys.exit(0)
+
+    harness = BenchmarkHarness(args.workdir, seed=args.seed, repeats=args.repeats,
+                               edges_per_entity=args.edges_per_entity,
+                               headlines_per_entity=args.headlines_per_entity,
+                               sentiment_model=args.sentiment_model, pipeline_mode=args.pipeline_mode)
+    report = harness.run(args.sizes, args.engines)
+    output = args.output or os.path.join(ROOT, "benchmarks", "results",
+                                         f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    save_report(report, output)
+    print(f"💾 Benchmark results saved to: {output}")
@@ -0,0 +1,45 @@
+import hashlib
+import numpy as np
+from typing import Dict, List
+
+class TinySentimentModel:
+    """
+    Drop-in stand-in for FinBERTAnalyzer (same predict / predict_each API and
+    [Positive, Negative, Neutral] column order) for benchmarks on machines without
+    torch or the FinBERT weights. A hashed bag-of-words linear layer plus softmax:
+    deterministic, dependency-free and cheap, so engine timings measure the
+    surrounding pipeline rather than the transformer.
+    """
+
+    NEGATIVE_WORDS = {"misses", "cuts", "downgraded", "warns", "probe", "fraud", "bankruptcy",
+                      "defaults", "insolvency", "investigation", "laundering", "fears"}
+    POSITIVE_WORDS = {"beats", "raises", "wins", "record", "upgraded", "growth", "buy"}
+
+    def __init__(self, buckets: int = 4096, seed: int = 42):
+        self.buckets = buckets
+        rng = np.random.default_rng(seed)
+        self.weights = rng.normal(0.0, 0.05, size=(buckets, 3))
+        for word in self.POSITIVE_WORDS:
+            self.weights[self._bucket(word)] += (2.0, -1.0, -0.5)
+        for word in self.NEGATIVE_WORDS:
+            self.weights[self._bucket(word)] += (-1.0, 2.0, -0.5)
+        self.bias = np.array([0.0, 0.0, 1.0])
+
+    def _bucket(self, token: str) -> int:
+        return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "big") % self.buckets
+
+    def predict_each(self, texts: List[str]) -> np.ndarray:
+        logits = np.tile(self.bias, (len(texts), 1))
+        for i, text in enumerate(texts):
+            tokens = text.lower().split()
+            if tokens:
+                logits[i] += self.weights[[self._bucket(t) for t in tokens]].sum(axis=0)
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        return (probs / probs.sum(axis=1, keepdims=True)).astype(np.float32)
+
+    def predict(self, texts: List[str]) -> Dict[str, float]:
+        if not texts:
+            return {"positive": 0.0, "negative": 0.0, "neutral": 1.0}
+        mean_probs = self.predict_each(texts).mean(axis=0)
+        return {"positive": float(mean_probs[0]), "negative": float(mean_probs[1]), "neutral": float(mean_probs[2])}
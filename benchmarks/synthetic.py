@@ -0,0 +1,123 @@
+import logging
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+logger = logging.getLogger("SyntheticData")
+
+# PaySim transaction types and their approximate shares
+TXN_TYPES = np.array(["CASH_OUT", "PAYMENT", "CASH_IN", "TRANSFER", "DEBIT"])
+TXN_SHARES = np.array([0.35, 0.34, 0.22, 0.08, 0.01])
+
+HEADLINE_SUBJECTS = ["{name} shares", "{name}", "Analysts on {name}", "{name} board", "Investors in {name}"]
+HEADLINE_EVENTS = {
+    "positive": ["beats earnings expectations", "raises full-year guidance", "wins major contract",
+                 "reports record revenue", "upgraded to buy"],
+    "neutral": ["schedules annual meeting", "appoints new director", "moves headquarters",
+                "files quarterly report", "announces product update"],
+    "negative": ["misses earnings estimates", "cuts dividend", "downgraded by analysts",
+                 "warns on profit", "faces regulatory probe"],
+    # Contain the stress overlay's panic keywords
+    "panic": ["accused of fraud", "files for bankruptcy", "defaults on bond payment",
+              "hit by insolvency fears", "under investigation for money laundering"]
+}
+EVENT_SHARES = {"positive": 0.3, "neutral": 0.35, "negative": 0.3, "panic": 0.05}
+
+class SyntheticDataGenerator:
+    """
+    Seeded generator for production-shaped inputs without the private data:
+    credit ratio tables, PaySim-like transaction networks (heavy-tailed activity)
+    and entity news headlines. The same seed and sizes always give the same files.
+    """
+
+    def __init__(self, seed: int = 42):
+        self.seed = seed
+
+    def _rng(self, stream: int) -> np.random.Generator:
+        # Independent stream per dataset, so changing one size never shifts another
+        return np.random.default_rng([self.seed, stream])
+
+    @staticmethod
+    def entity_ids(n: int) -> np.ndarray:
+        width = max(5, len(str(n - 1)))
+        return np.char.add("ENT-", np.char.zfill(np.arange(n).astype(str), width))
+
+    def credit(self, n: int) -> pd.DataFrame:
+        """Financial ratios per entity plus an `is_default` label driven by them."""
+        rng = self._rng(1)
+        roa = rng.normal(0.03, 0.08, n)
+        debt_ratio = np.clip(rng.beta(2.0, 3.0, n) * 1.5, 0.0, None)
+        operating_margin = rng.normal(0.08, 0.15, n)
+        net_income_assets = roa * rng.uniform(0.6, 1.1, n) + rng.normal(0.0, 0.01, n)
+
+        logit = -3.0 - 12.0 * roa + 2.5 * debt_ratio - 4.0 * operating_margin
+        is_default = (rng.random(n) < 1.0 / (1.0 + np.exp(-logit))).astype(np.int8)
+        return pd.DataFrame({
+            "entity_id": self.entity_ids(n),
+            "roa": roa.round(6),
+            "debt_ratio": debt_ratio.round(6),
+            "operating_margin": operating_margin.round(6),
+            "net_income_assets": net_income_assets.round(6),
+            "is_default": is_default
+        })
+
+    def network(self, n_entities: int, n_edges: int, zipf_a: float = 1.1, steps: int = 744) -> pd.DataFrame:
+        """
+        PaySim-like transactions (source, target, amount, txn_type, is_fraud, step).
+        Entity activity follows a power law, so a few hubs carry much of the flow.
+        """
+        rng = self._rng(2)
+        activity = 1.0 / np.arange(1, n_entities + 1) ** zipf_a
+        activity = activity[rng.permutation(n_entities)]
+        activity /= activity.sum()
+
+        source = rng.choice(n_entities, size=n_edges, p=activity)
+        target = rng.choice(n_entities, size=n_edges, p=activity)
+        loops = source == target
+        target[loops] = (target[loops] + 1 + rng.integers(0, max(n_entities - 1, 1), loops.sum())) % n_entities
+
+        ids = self.entity_ids(n_entities)
+        return pd.DataFrame({
+            "source": ids[source],
+            "target": ids[target],
+            "amount": rng.lognormal(mean=7.0, sigma=1.5, size=n_edges).round(2),
+            "txn_type": rng.choice(TXN_TYPES, size=n_edges, p=TXN_SHARES),
+            "is_fraud": (rng.random(n_edges) < 0.0013).astype(np.int8),
+            "step": rng.integers(1, steps + 1, n_edges)
+        })
+
+    def headlines(self, n_entities: int, n_headlines: int) -> pd.DataFrame:
+        """(entity_id, headline) rows; coverage is skewed, so many entities have no news."""
+        rng = self._rng(3)
+        coverage = rng.pareto(1.5, n_entities) + 1e-3
+        coverage /= coverage.sum()
+        owner = rng.choice(n_entities, size=n_headlines, p=coverage)
+
+        kinds = list(EVENT_SHARES)
+        events = [HEADLINE_EVENTS[kind] for kind in kinds]
+        kind_idx = rng.choice(len(kinds), size=n_headlines, p=list(EVENT_SHARES.values()))
+        event_idx = rng.integers(0, 5, n_headlines)
+        subject_idx = rng.integers(0, len(HEADLINE_SUBJECTS), n_headlines)
+
+        ids = self.entity_ids(n_entities)
+        text = [
+            f"{HEADLINE_SUBJECTS[s].format(name=f'Company {ids[o][4:]}')} {events[k][e]}"
+            for o, k, e, s in zip(owner, kind_idx, event_idx, subject_idx)
+        ]
+        return pd.DataFrame({"entity_id": ids[owner], "headline": text})
+
+    def write_dataset(self, data_dir: str, n_entities: int, edges_per_entity: float = 5.0,
+                      headlines_per_entity: float = 2.0) -> Dict[str, str]:
+        """Writes credit_clean.csv / network_mapped.csv / news_mapped.csv as the pipeline expects them."""
+        os.makedirs(data_dir, exist_ok=True)
+        paths = {
+            "credit": os.path.join(data_dir, "credit_clean.csv"),
+            "network": os.path.join(data_dir, "network_mapped.csv"),
+            "news": os.path.join(data_dir, "news_mapped.csv")
+        }
+        self.credit(n_entities).to_csv(paths["credit"], index=False)
+        self.network(n_entities, int(n_entities * edges_per_entity)).to_csv(paths["network"], index=False)
+        self.headlines(n_entities, int(n_entities * headlines_per_entity)).to_csv(paths["news"], index=False)
+        logger.info(f"🧪 Synthetic dataset ({n_entities} entities, seed {self.seed}) written to {data_dir}")
+        return paths
@@ -4,6 +4,12 @@ import json
 import plotly.express as px
 import plotly.graph_objects as go
 import os
+import sys
+
+# Ensure root path is accessible
+sys.path.append(os.getcwd())
+
+from src.systemic_risk.exposure_index import ExposureIndex
 
 # --- 1. PAGE CONFIGURATION ---
 st.set_page_config(
@@ -193,6 +199,8 @@ st.markdown("""
 
 # --- 3. ADVANCED DATA ENGINE ---
 DATA_FILE = 'outputs/final_risk_analysis.json'
+COMMUNITY_FILE = 'outputs/community_summary.json'
+EXPOSURE_FILE = 'outputs/exposure_index.npz'
 
 @st.cache_data
 def load_data():
@@ -236,6 +244,31 @@ def load_data():
 
 df, raw_data_dict = load_data()
 
+@st.cache_data
+def load_communities():
+    if not os.path.exists(COMMUNITY_FILE):
+        return None
+    try:
+        with open(COMMUNITY_FILE, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        st.error(f"Error reading community summary: {e}")
+        return None
+
+community_data = load_communities()
+
+@st.cache_resource
+def load_exposure_index():
+    if not os.path.exists(EXPOSURE_FILE):
+        return None
+    try:
+        return ExposureIndex.from_file(EXPOSURE_FILE)
+    except Exception as e:
+        st.error(f"Error reading exposure index: {e}")
+        return None
+
+exposure_index = load_exposure_index()
+
 # --- 4. PREMIUM SIDEBAR ---
 with st.sidebar:
     st.markdown("<h1 style='text-align: center; margin-bottom: 0.5rem;'>🛡️</h1>", unsafe_allow_html=True)
@@ -297,10 +330,11 @@ st.markdown("<h1>📊 Risk Intelligence Dashboard</h1>", unsafe_allow_html=True)
 st.markdown("<p style='color: rgba(255,255,255,0.6); font-size: 1.1rem; margin-bottom: 2rem;'>Real-time financial risk monitoring and portfolio analytics</p>", unsafe_allow_html=True)
 
 # TABS
-tab_overview, tab_finance, tab_inspector, tab_raw = st.tabs([
+tab_overview, tab_finance, tab_inspector, tab_communities, tab_raw = st.tabs([
     "🎯 Overview", 
     "📈 Financial Analytics", 
     "🔍 Entity Deep Dive", 
+    "🧩 Network Communities",
     "📋 Raw Data"
 ])
 
@@ -844,8 +878,103 @@ with tab_inspector:
                         centrality = sig_sys['metadata'].get('centrality_score', 0)
                         st.caption(f"📊 Centrality: {centrality:.4f}")
 
+                # Counterparty Exposure Drill-down (served from the precomputed k-hop index)
+                st.markdown("<div style='height: 1.5rem;'></div>", unsafe_allow_html=True)
+                st.markdown("<div class='section-header'><h3>🔗 Counterparty Exposure</h3><p style='color: rgba(255,255,255,0.6); margin-top: 0.5rem;'>Entities within k hops and the aggregated flow connecting them</p></div>", unsafe_allow_html=True)
+                
+                if exposure_index is None:
+                    st.info(f"ℹ️ No exposure index found at `{EXPOSURE_FILE}`. It is built at the end of `python run_full_analysis.py --exposure-index`.")
+                else:
+                    ex1, ex2 = st.columns([1, 1])
+                    with ex1:
+                        hop_limit = st.slider("Max Hops", 1, exposure_index.max_hops, exposure_index.max_hops)
+                    with ex2:
+                        row_limit = st.slider("Counterparties", 5, exposure_index.top_n, min(20, exposure_index.top_n))
+                    
+                    exposures = exposure_index.query(str(selected_id), max_hops=hop_limit, limit=row_limit)
+                    if not exposures:
+                        st.caption("No counterparties within range for this entity.")
+                    else:
+                        exposure_df = pd.DataFrame(exposures).rename(columns={
+                            'entity_id': 'Counterparty', 'hops': 'Hops', 'exposure': 'Aggregated Flow'
+                        })
+                        fig_exp = px.bar(
+                            exposure_df,
+                            x='Aggregated Flow',
+                            y='Counterparty',
+                            color='Hops',
+                            orientation='h',
+                            color_continuous_scale='Purples_r'
+                        )
+                        fig_exp.update_layout(
+                            paper_bgcolor='rgba(0,0,0,0)',
+                            plot_bgcolor='rgba(0,0,0,0)',
+                            font=dict(color='white'),
+                            xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
+                            yaxis=dict(autorange='reversed'),
+                            margin=dict(t=20, b=40, l=40, r=20),
+                            height=max(300, 24 * len(exposure_df))
+                        )
+                        st.plotly_chart(fig_exp, use_container_width=True)
+
+# ==========================================
+# TAB 4: NETWORK COMMUNITIES
+# ==========================================
+with tab_communities:
+    st.markdown("<div class='section-header'><h3>🧩 Network Communities</h3><p style='color: rgba(255,255,255,0.6); margin-top: 0.5rem;'>Systemic risk aggregated per transaction-graph community</p></div>", unsafe_allow_html=True)
+    
+    if not community_data:
+        st.info(f"ℹ️ No community summary found at `{COMMUNITY_FILE}`. It is written at the end of `python run_full_analysis.py`.")
+    else:
+        comm_df = pd.DataFrame([
+            {
+                'Community': f"C{c['community_id']}",
+                'Size': c['size'],
+                'Internal Flow': c['internal_flow'],
+                'Cross Outflow': c['cross_outflow'],
+                'Cross Inflow': c['cross_inflow'],
+                'Boundary Nodes': c['boundary_nodes'],
+                'Mean Systemic': c['mean_systemic_score'],
+                'Max Systemic': c['max_systemic_score'],
+                'Top Entity': c['top_entities'][0]['entity_id'] if c['top_entities'] else '-'
+            }
+            for c in community_data
+        ])
+        
+        k1, k2, k3 = st.columns(3)
+        with k1:
+            st.metric("Communities Shown", f"{len(comm_df):,}")
+        with k2:
+            st.metric("Largest Community", f"{comm_df['Size'].max():,} nodes")
+        with k3:
+            st.metric("Highest Mean Systemic", f"{comm_df['Mean Systemic'].max():.2f}")
+        
+        fig_comm = px.scatter(
+            comm_df,
+            x='Size',
+            y='Mean Systemic',
+            size='Internal Flow',
+            color='Max Systemic',
+            hover_name='Community',
+            hover_data=['Top Entity', 'Boundary Nodes', 'Cross Outflow'],
+            color_continuous_scale='Reds',
+            log_x=True
+        )
+        fig_comm.update_layout(
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='white'),
+            xaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
+            yaxis=dict(gridcolor='rgba(255,255,255,0.1)'),
+            margin=dict(t=20, b=40, l=40, r=20),
+            height=450
+        )
+        st.plotly_chart(fig_comm, use_container_width=True)
+        
+        st.dataframe(comm_df, use_container_width=True, height=400)
+
 # ==========================================
-# TAB 4: RAW DATA
+# TAB 5: RAW DATA
 # ==========================================
 with tab_raw:
     st.markdown("<div class='section-header'><h3>📋 Raw Dataset</h3><p style='color: rgba(255,255,255,0.6); margin-top: 0.5rem;'>Complete data table with all metrics</p></div>", unsafe_allow_html=True)
@@ -2,6 +2,10 @@ import logging
 import sys
 import os
 import json
+import queue
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 # Ensure root path is accessible
@@ -10,10 +14,13 @@ sys.path.append(os.getcwd())
 # Import The Brain & Limbs
 from src.aggregation.fusion_engine import RiskFusionEngine
 from src.credit_risk.engine import CreditRiskEngine
+from src.credit_risk.features import CreditFeatureEngineer
 from src.sentiment_risk.engine import SentimentRiskEngine
 from src.systemic_risk.engine import SystemicRiskEngine
 from src.ingestion.loaders import SentinelDataLoader
 from src.schemas.risk_objects import RiskSignal 
+from src.pipeline.fingerprints import InputFingerprinter
+from src.monitoring.metrics import METRICS
 
 # Configure Logging
 logging.basicConfig(
@@ -24,21 +31,29 @@ logging.basicConfig(
 logger = logging.getLogger("SentinAL_Core")
 
 class SentinAL:
-    def __init__(self):
+    def __init__(self, concurrent_engines: bool = False, queue_size: int = 64, sentiment_analyzer=None,
+                 stage_batch_size: int = 256):
         logger.info("🤖 Initializing SentinAL Core Systems...")
+        # Run credit / sentiment / systemic side by side inside analyze_batch()
+        self.concurrent_engines = concurrent_engines
+        self.queue_size = queue_size  # Blocks of signals buffered between the stages and the fusion join
+        self.stage_batch_size = stage_batch_size  # Entities per engine call in the concurrent stages
         self.loader = SentinelDataLoader(data_dir="data/processed")
         
         # Initialize Engines
         self.credit_engine = CreditRiskEngine(model_path="models/credit_model.json")
-        self.sentiment_engine = SentimentRiskEngine()
+        self.sentiment_engine = SentimentRiskEngine(analyzer=sentiment_analyzer)
         self.systemic_engine = SystemicRiskEngine()
         
         # Initialize Brain
-        self.brain = RiskFusionEngine(use_ml_model=True, model_path="models/meta_fusion_model.pkl")
+        self.fusion_model_path = "models/meta_fusion_model.pkl"
+        self.brain = RiskFusionEngine(use_ml_model=True, model_path=self.fusion_model_path)
+        self.fingerprinter = InputFingerprinter()
         
         # Ingest Graph
         logger.info("🕸️ Ingesting Systemic Context...")
-        self.systemic_engine.ingest_data("data/processed/network_mapped.csv")
+        with METRICS.timer("data_load.network"):
+            self.systemic_engine.ingest_data("data/processed/network_mapped.csv")
         logger.info("✅ SentinAL System Ready.")
 
     def _validate_signal(self, signal, engine_name):
@@ -46,52 +61,247 @@ class SentinAL:
         SAFETY CHECK: Ensures the engine returned a RiskSignal, not a Profile.
         """
         if not isinstance(signal, RiskSignal):
-            logger.error(f"❌ TYPE ERROR: {engine_name} returned '{type(signal).__name__}' instead of 'RiskSignal'.")
+            logger.error("❌ TYPE ERROR: %s returned '%s' instead of 'RiskSignal'.", engine_name, type(signal).__name__)
             return False
         return True
 
-    def analyze_batch(self, entities: List[str], df_credit, news_loader) -> List[dict]:
-        results = []
-        
+    def _resolve_features(self, entities: List[str], df_credit) -> List[tuple]:
+        """Looks up the financial features of every entity; returns (entity_id, feats) pairs."""
+        resolved = []
         for raw_id in entities:
+            # --- TYPE FIX: Force ID to be a String ---
+            entity_id = str(raw_id)
+
+            # Note: We must check against the index using the correct type. 
+            # If dataframe index is int, use raw_id. If str, use entity_id.
+            if raw_id in df_credit.index:
+                row = df_credit.loc[raw_id]
+            elif entity_id in df_credit.index:
+                row = df_credit.loc[entity_id]
+            else:
+                logger.warning("⚠️ Entity %s not found in credit data. Skipping.", entity_id)
+                continue
+            feats = {k: float(v) for k,v in row.items() if k in ['roa', 'debt_ratio', 'operating_margin', 'net_income_assets']}
+            resolved.append((entity_id, feats))
+        return resolved
+
+    def _engine_stages(self, feats_by_entity: dict) -> List[tuple]:
+        """(name, callable) per engine, in the order signals are handed to the fusion engine."""
+        return [
+            ("CreditEngine", lambda entity_id: self.credit_engine.analyze(entity_id, feats_by_entity[entity_id])),
+            ("SentimentEngine", self.sentiment_engine.analyze),
+            ("SystemicEngine", self.systemic_engine.analyze)
+        ]
+
+    def _batch_stages(self, feats_by_entity: dict) -> List[tuple]:
+        """
+        Block-wise counterpart of _engine_stages(): (name, callable) per engine, where the
+        callable takes a list of entity IDs and returns their signals in the same order.
+        Each call is one engine batch (one XGBoost predict, one FinBERT pass over the uncached
+        headlines, one systemic score gather), as in analyze_portfolio().
+        """
+        def credit(entity_ids):
+            frame = pd.DataFrame([feats_by_entity[e] for e in entity_ids], index=entity_ids)
+            scored = self.credit_engine.analyze_many(frame)
+            self.credit_engine.hot_log.record_many(scored['score'])
+            return [self.credit_engine.build_signal(e, feats_by_entity[e], prob, score)
+                    for e, prob, score in zip(entity_ids, scored['probability'], scored['score'])]
+
+        def sentiment(entity_ids):
+            scored = self.sentiment_engine.analyze_many(entity_ids)
+            self.sentiment_engine.hot_log.record_many(scored['score'])
+            return [self.sentiment_engine.build_signal(e, negative, score, count, headline)
+                    for e, negative, score, count, headline
+                    in zip(entity_ids, scored['negative'], scored['score'], scored['headline_count'], scored['top_headline'])]
+
+        def systemic(entity_ids):
+            scores = self.systemic_engine.score_many(entity_ids)
+            self.systemic_engine.hot_log.record_many(scores)
+            return [self.systemic_engine.build_signal(e, score) for e, score in zip(entity_ids, scores)]
+
+        return [("CreditEngine", credit), ("SentimentEngine", sentiment), ("SystemicEngine", systemic)]
+
+    def _analyze_one(self, name: str, analyze, entity_id: str):
+        try:
+            with METRICS.timer(f"{name}.analyze"):
+                return analyze(entity_id)
+        except Exception as e:
+            logger.error("❌ %s failed for %s: %s", name, entity_id, e, exc_info=True)
+            return None
+
+    def _run_stage(self, stage: int, name: str, analyze_many, analyze, entity_ids: List[str], out_queue: queue.Queue):
+        """
+        Worker thread body: runs one engine over the batch in blocks of stage_batch_size and
+        streams (stage, block_start, signals) into the bounded fusion queue. A block whose
+        batch call fails is retried entity by entity; failed or invalid signals are sent as None.
+        """
+        for start in range(0, len(entity_ids), self.stage_batch_size):
+            block = entity_ids[start:start + self.stage_batch_size]
             try:
-                # --- TYPE FIX: Force ID to be a String ---
-                entity_id = str(raw_id) 
-
-                # 1. Get Financials
-                # Note: We must check against the index using the correct type. 
-                # If dataframe index is int, use raw_id. If str, use entity_id.
-                if raw_id in df_credit.index:
-                    row = df_credit.loc[raw_id]
-                    feats = {k: float(v) for k,v in row.items() if k in ['roa', 'debt_ratio', 'operating_margin', 'net_income_assets']}
-                elif entity_id in df_credit.index:
-                    row = df_credit.loc[entity_id]
-                    feats = {k: float(v) for k,v in row.items() if k in ['roa', 'debt_ratio', 'operating_margin', 'net_income_assets']}
-                else:
-                    logger.warning(f"⚠️ Entity {entity_id} not found in credit data. Skipping.")
+                with METRICS.timer(f"{name}.analyze_many", items=len(block)):
+                    signals = analyze_many(block)
+            except Exception as e:
+                logger.error("❌ %s failed on a block of %s entities, retrying one by one: %s", name, len(block), e)
+                signals = [self._analyze_one(name, analyze, entity_id) for entity_id in block]
+            signals = [s if s is not None and self._validate_signal(s, name) else None for s in signals]
+            out_queue.put((stage, start, signals))
+        out_queue.put((stage, None, None))  # End-of-stage marker
+
+    def _analyze_concurrently(self, resolved: List[tuple]) -> tuple:
+        """
+        Runs the three engines side by side, one thread each, every stage calling its
+        engine's batch API on blocks of stage_batch_size entities. The stages feed one
+        bounded queue that the calling thread drains, joining signals by entity.
+
+        Threads only overlap work that runs outside the GIL: XGBoost predict, torch
+        inference in FinBERT and file reads. The Python around them (DataFrame assembly,
+        RiskSignal construction) still runs one thread at a time, which is why the
+        stages work in blocks rather than per entity.
+        """
+        entity_ids = [entity_id for entity_id, _ in resolved]
+        feats_by_entity = dict(resolved)
+        stages = self._batch_stages(feats_by_entity)
+        singles = self._engine_stages(feats_by_entity)
+        results = queue.Queue(maxsize=self.queue_size)
+        pending = [[None] * len(stages) for _ in entity_ids]
+        failed = set()
+
+        with ThreadPoolExecutor(max_workers=len(stages), thread_name_prefix="engine") as pool:
+            for stage, ((name, analyze_many), (_, analyze)) in enumerate(zip(stages, singles)):
+                pool.submit(self._run_stage, stage, name, analyze_many, analyze, entity_ids, results)
+
+            running = len(stages)
+            while running:
+                stage, start, signals = results.get()
+                if start is None:
+                    running -= 1
                     continue
+                for position, signal in enumerate(signals, start=start):
+                    if signal is None:
+                        failed.add(position)
+                    else:
+                        pending[position][stage] = signal
+
+        complete = [i for i in range(len(entity_ids)) if i not in failed]
+        return [entity_ids[i] for i in complete], [pending[i] for i in complete]
+
+    def _analyze_sequentially(self, resolved: List[tuple]) -> tuple:
+        entity_ids, signal_lists = [], []
+        stages = self._engine_stages(dict(resolved))
+
+        for entity_id, _ in resolved:
+            try:
+                signals = []
+                for name, analyze in stages:
+                    with METRICS.timer(f"{name}.analyze"):
+                        signal = analyze(entity_id)
+                    if not self._validate_signal(signal, name): break
+                    signals.append(signal)
+                else:
+                    entity_ids.append(entity_id)
+                    signal_lists.append(signals)
 
-                # 2. Run Analysis & Check Types
-                # --- Credit ---
-                sig_credit = self.credit_engine.analyze(entity_id, feats)
-                if not self._validate_signal(sig_credit, "CreditEngine"): continue
-
-                # --- Sentiment ---
-                sig_sentiment = self.sentiment_engine.analyze(entity_id) 
-                if not self._validate_signal(sig_sentiment, "SentimentEngine"): continue
-                
-                # --- Systemic ---
-                sig_systemic = self.systemic_engine.analyze(entity_id)
-                if not self._validate_signal(sig_systemic, "SystemicEngine"): continue
-
-                # 3. Fuse
-                profile = self.brain.aggregate(entity_id, [sig_credit, sig_sentiment, sig_systemic])
-                results.append(profile.to_json())
-                
             except Exception as e:
-                logger.error(f"❌ Analysis failed for {entity_id}: {e}", exc_info=True)
+                logger.error("❌ Analysis failed for %s: %s", entity_id, e, exc_info=True)
+        return entity_ids, signal_lists
+
+    def analyze_batch(self, entities: List[str], df_credit, news_loader) -> List[dict]:
+        # 1. Get Financials
+        resolved = self._resolve_features(entities, df_credit)
+
+        # 2. Run Analysis & Check Types (engines side by side when enabled)
+        if self.concurrent_engines:
+            entity_ids, signal_lists = self._analyze_concurrently(resolved)
+        else:
+            entity_ids, signal_lists = self._analyze_sequentially(resolved)
+
+        # 3. Fuse the whole batch at once (one meta-model call instead of one per entity)
+        if not entity_ids:
+            return []
+        fused = self.brain.aggregate_many(entity_ids, self.brain.score_matrix(signal_lists), signal_lists)
+        with METRICS.timer("serialization", items=len(entity_ids)):
+            return [profile.to_json() for profile in fused["profiles"]]
+
+    def input_fingerprints(self, df_credit) -> dict:
+        """
+        Per-entity input fingerprints ({entity_id: {credit, sentiment, systemic, model}})
+        for every row of the credit frame. Stored with each result so the next run can
+        rescore only the entities whose inputs or models changed.
+        """
+        entity_ids = [str(raw_id) for raw_id in df_credit.index]
+        features = CreditFeatureEngineer.prepare_for_training(df_credit).to_numpy(dtype=np.float64)
+        model = self.fingerprinter.model_version(
+            [self.credit_engine.model_path,
+             os.path.splitext(self.fusion_model_path)[0] + ".npz",
+             self.fusion_model_path],
+            {
+                "fusion_weights": self.brain.weights,
+                "risk_thresholds": self.brain.risk_thresholds(),
+                "ml_fusion": self.brain.model is not None,
+                "sentiment_model": self.sentiment_engine.cache.model_name,
+                "keyword_penalty": self.sentiment_engine.overlay.KEYWORD_PENALTY
+            }
+        )
+
+        columns = zip(
+            self.fingerprinter.credit(features),
+            self.fingerprinter.sentiment(self.sentiment_engine.loader.get_headlines(e) for e in entity_ids),
+            self.fingerprinter.systemic(entity_ids, self.systemic_engine.sparse_graph,
+                                        self.systemic_engine.score_many(entity_ids))
+        )
+        return {
+            entity_id: {"credit": credit, "sentiment": sentiment, "systemic": systemic, "model": model}
+            for entity_id, (credit, sentiment, systemic) in zip(entity_ids, columns)
+        }
+
+    def analyze_portfolio(self, df_credit) -> List[dict]:
+        """
+        Columnar counterpart of analyze_batch() for a whole credit frame (indexed by entity ID).
+        Each engine runs once over all entities (one credit predict, one sentiment pass,
+        one systemic score gather), the columns are joined by entity and fused as a single
+        matrix. RiskSignal / AggregatedRiskProfile objects are only built for the output.
+        """
+        if df_credit.empty:
+            return []
+        entity_ids = [str(raw_id) for raw_id in df_credit.index]
+
+        # 1. One pass per engine
+        with METRICS.timer("credit.batch", items=len(entity_ids)):
+            credit = self.credit_engine.analyze_many(df_credit)
+        with METRICS.timer("sentiment.batch", items=len(entity_ids)):
+            sentiment = self.sentiment_engine.analyze_many(entity_ids)
+        with METRICS.timer("systemic.batch", items=len(entity_ids)):
+            systemic = self.systemic_engine.score_many(entity_ids)
+
+        # Aggregated log summaries (per-entity lines are skipped on this path)
+        self.credit_engine.hot_log.record_many(credit['score'])
+        self.sentiment_engine.hot_log.record_many(sentiment['score'])
+        self.systemic_engine.hot_log.record_many(systemic)
+
+        # 2. Join by entity position (columns follow RiskFusionEngine.FEATURES)
+        matrix = np.column_stack([credit['score'].to_numpy(), systemic, sentiment['score'].to_numpy()])
+
+        # 3. Output boundary: materialize signals, then fuse the whole matrix at once
+        features = CreditFeatureEngineer.prepare_for_training(df_credit).astype(float).to_dict('records')
+        signal_lists = [
+            [
+                self.credit_engine.build_signal(entity_id, feats, credit_prob, credit_score),
+                self.sentiment_engine.build_signal(entity_id, negative, sentiment_score, count, headline),
+                self.systemic_engine.build_signal(entity_id, systemic_score)
+            ]
+            for entity_id, feats, credit_prob, credit_score, negative, sentiment_score, count, headline, systemic_score
+            in zip(entity_ids, features, credit['probability'], credit['score'],
+                   sentiment['negative'], sentiment['score'], sentiment['headline_count'],
+                   sentiment['top_headline'], systemic)
+        ]
+        fused = self.brain.aggregate_many(entity_ids, matrix, signal_lists)
+        logger.info("📦 Columnar analysis complete for %d entities.", len(entity_ids))
+        with METRICS.timer("serialization", items=len(entity_ids)):
+            return [profile.to_json() for profile in fused["profiles"]]
 
-        return results
+    def flush_caches(self):
+        """Writes the sentiment score cache (hot paths only save it periodically); call at shutdown."""
+        self.sentiment_engine.cache.save()
 
 if __name__ == "__main__":
     app = SentinAL()
@@ -1,8 +1,12 @@
+import argparse
 import json
 import logging
+import multiprocessing
 import sys
 import os
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
 from tqdm import tqdm
 
 # --- FORCE CPU (Optional: Uncomment if GPU is unstable or OOM) ---
@@ -13,6 +17,10 @@ sys.path.append(os.getcwd())
 
 from src.ingestion.loaders import SentinelDataLoader
 from src.sentiment_risk.news_loader import NewsLoader
+from src.pipeline.checkpoint import CheckpointLog
+from src.pipeline.sharding import limit_threads, merge_shards, shard_of, shard_path
+from src.monitoring.metrics import METRICS, configure_metrics
+from src.monitoring.hot_path_log import HotPathLog
 from main import SentinAL
 
 # Configure Logging to File
@@ -25,46 +33,133 @@ console = logging.StreamHandler()
 console.setLevel(logging.INFO)
 logging.getLogger('').addHandler(console)
 
-def run_pipeline():
-    print("🚀 STARTING SENTINAL BATCH ANALYSIS...")
+OUTPUT_FILE = "outputs/final_risk_analysis.json"
+CHECKPOINT_FILE = "outputs/final_risk_analysis.ckpt.jsonl"
 
-    # 1. Initialize The App
-    app = SentinAL()
+def load_previous_results(path: str) -> dict:
+    """Last run's fingerprinted results, keyed by entity ID (empty if there are none)."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            records = json.load(f)
+    except Exception as e:
+        logging.warning(f"Previous results unreadable, rescoring everything: {e}")
+        return {}
+    return {str(r.get("entity_id")): r for r in records if "input_fingerprints" in r}
+
+def build_network_artifacts(app: SentinAL, exposure_index: Optional[bool] = None):
+    """
+    Per-community systemic summary (when partitioning is enabled) and k-hop exposure
+    index (when `exposure_index.enabled`, or forced with --exposure-index).
+    """
+    engine = app.systemic_engine
+    if exposure_index is None:
+        exposure_index = engine.calculator.config.get('exposure_index', {}).get('enabled', False)
+    try:
+        if engine.partition_cfg.get('enabled', False):
+            engine.community_summary()
+        if exposure_index:
+            engine.build_exposure_index()
+    except Exception as e:
+        logging.warning(f"Network artifacts skipped: {e}")
+
+def run_pipeline(mode: str = "batch", chunk_size: int = 5000, concurrent: bool = False,
+                 resume: bool = False, incremental: bool = False,
+                 shard_index: int = 0, num_shards: int = 1, app: Optional[SentinAL] = None,
+                 log_mode: Optional[str] = None, exposure_index: Optional[bool] = None):
+    sharded = num_shards > 1
+    label = f"{mode} mode, shard {shard_index + 1}/{num_shards}" if sharded else f"{mode} mode"
+    print(f"🚀 STARTING SENTINAL BATCH ANALYSIS ({label})...")
+    monitoring = configure_metrics()
+
+    # Per-entity engine log lines: verbose (all at INFO), sampled or summary-only
+    HotPathLog.configure(
+        mode=log_mode or monitoring.get("log_mode", "verbose"),
+        sample_rate=monitoring.get("log_sample_rate", 0.01),
+        summary_every=monitoring.get("log_summary_every", 1000)
+    )
+
+    # 1. Initialize The App (unless a prepared one is passed in, e.g. by the benchmarks)
+    if app is None:
+        app = SentinAL(concurrent_engines=concurrent)
     
     # 2. Load Helper Data Sources (for fast lookups)
     print("📂 Loading Data Sources...")
     # Load Credit Data and index by Entity ID for O(1) access
     loader = SentinelDataLoader(data_dir="data/processed")
-    df_credit = loader.load_credit_data()
+    with METRICS.timer("data_load.credit"):
+        df_credit = loader.load_credit_data()
     if 'entity_id' in df_credit.columns:
         df_credit.set_index('entity_id', inplace=True)
     
     # Load News
-    news_loader = NewsLoader(data_path="data/processed/news_mapped.csv")
+    with METRICS.timer("data_load.news"):
+        news_loader = NewsLoader(data_path="data/processed/news_mapped.csv")
     
-    # 3. Define Workload
+    # 3. Define Workload (a shard keeps only the entities hashed to it)
+    if sharded:
+        in_shard = [shard_of(entity_id, num_shards) == shard_index for entity_id in df_credit.index]
+        df_credit = df_credit[in_shard]
     all_entities = list(df_credit.index)
     total = len(all_entities)
     print(f"📊 Found {total} entities to analyze.")
 
-    results = []
-    output_file = "outputs/final_risk_analysis.json"
+    output_file = shard_path(OUTPUT_FILE, shard_index, num_shards) if sharded else OUTPUT_FILE
+    checkpoint_file = shard_path(CHECKPOINT_FILE, shard_index, num_shards) if sharded else CHECKPOINT_FILE
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
+    # Append-only checkpoint log: every batch is committed (fsync'd) as it completes,
+    # and --resume skips the entities already committed by an interrupted run
+    checkpoint = CheckpointLog(path=checkpoint_file, resume=resume)
+    pending_mask = [not checkpoint.is_committed(entity_id) for entity_id in all_entities]
+    df_pending = df_credit[pending_mask]
+    pending_entities = list(df_pending.index)
+    if resume:
+        print(f"⏯️ Resuming: {len(checkpoint)} already committed, {len(pending_entities)} remaining.")
+
     # 4. Processing Loop
-    # We save every 100 records to prevent data loss on crash
-    BATCH_SIZE = 100
+    # We commit every 100 records to prevent data loss on crash
+    # (columnar mode runs every engine once per chunk of `chunk_size` entities)
+    BATCH_SIZE = 100 if mode == "batch" else chunk_size
     
     print("\n🌊 Diving into Risk Stream...")
     try:
-        for i in tqdm(range(0, total, BATCH_SIZE), desc="Batch Processing"):
-            batch_ids = all_entities[i : i + BATCH_SIZE]
+        # Input fingerprints (stored with every result); --incremental carries last run's
+        # result over for each entity whose credit row, headlines, graph neighbourhood
+        # and models are all unchanged, and only rescores the rest
+        with METRICS.timer("fingerprints", items=len(df_pending)):
+            fingerprints = app.input_fingerprints(df_pending)
+        if incremental:
+            previous = load_previous_results(output_file)
+            carried, changed_by = [], {name: 0 for name in ("credit", "sentiment", "systemic", "model")}
+            for entity_id in pending_entities:
+                record = previous.get(str(entity_id))
+                changed = app.fingerprinter.changed(record and record["input_fingerprints"], fingerprints[str(entity_id)])
+                if not changed:
+                    carried.append(record)
+                elif record:
+                    for name in changed:
+                        changed_by[name] += 1
+            if carried:
+                checkpoint.commit(carried)
+            keep_mask = [not checkpoint.is_committed(entity_id) for entity_id in pending_entities]
+            df_pending = df_pending[keep_mask]
+            pending_entities = list(df_pending.index)
+            print(f"♻️ Incremental: {len(carried)} unchanged, {len(pending_entities)} to rescore "
+                  f"(changed inputs: {changed_by}).")
+
+        for i in tqdm(range(0, len(pending_entities), BATCH_SIZE), desc="Batch Processing"):
+            batch_ids = pending_entities[i : i + BATCH_SIZE]
             
             # Use the app's batch processor
             # We need to adapt the app's method slightly or call it directly here
             # Calling the logic directly here for clarity in the runner:
             
-            batch_results = app.analyze_batch(batch_ids, df_credit, news_loader)
+            if mode == "columnar":
+                batch_results = app.analyze_portfolio(df_pending.iloc[i : i + BATCH_SIZE])
+            else:
+                batch_results = app.analyze_batch(batch_ids, df_credit, news_loader)
             
             # Convert JSON strings to objects if needed
             cleaned_results = []
@@ -74,12 +169,16 @@ def run_pipeline():
                 else:
                     cleaned_results.append(res)
             
-            results.extend(cleaned_results)
+            for res in cleaned_results:
+                res["input_fingerprints"] = fingerprints.get(str(res.get("entity_id")))
             
-            # Intermediate Save (Checkpointing)
-            if i % 500 == 0:
-                with open(output_file, 'w') as f:
-                    json.dump(results, f, indent=2)
+            # Checkpointing (append + fsync; O(batch) per commit)
+            with METRICS.timer("checkpoint.commit", items=len(cleaned_results)):
+                checkpoint.commit(cleaned_results)
+
+        # Graph-wide dashboard artifacts: only after a complete run, and only on the first shard
+        if shard_index == 0:
+            build_network_artifacts(app, exposure_index)
 
     except KeyboardInterrupt:
         print("\n🛑 Execution Interrupted by User. Saving progress...")
@@ -87,13 +186,101 @@ def run_pipeline():
         print(f"\n❌ Critical Failure: {e}")
         logging.error(f"Critical Failure: {e}", exc_info=True)
     finally:
-        # Final Save
-        with open(output_file, 'w') as f:
-            json.dump(results, f, indent=2)
+        # Final Save: compact the committed log into the consolidated JSON array
+        with METRICS.timer("checkpoint.compact"):
+            processed = checkpoint.compact(output_file)
+        checkpoint.close()
+        app.flush_caches()
+        HotPathLog.flush_all()
         
         print(f"\n✅ ANALYSIS COMPLETE.")
-        print(f"📄 Processed: {len(results)}/{total}")
+        print(f"📄 Processed: {processed}/{total}")
         print(f"💾 Results saved to: {output_file}")
 
+        # Per-stage timing histograms (only when instrumentation is enabled)
+        if METRICS.enabled:
+            metrics_file = monitoring.get("metrics_path", "outputs/metrics.json")
+            if sharded:
+                metrics_file = shard_path(metrics_file, shard_index, num_shards)
+            METRICS.log_summary()
+            METRICS.write_json(metrics_file)
+            print(f"📈 Stage metrics saved to: {metrics_file}")
+
+def _run_shard(shard_index: int, num_shards: int, threads: int, options: dict):
+    """Worker process entry point: its own engines, thread pools capped at `threads`."""
+    limit_threads(threads)
+    run_pipeline(shard_index=shard_index, num_shards=num_shards, **options)
+
+def run_sharded(num_shards: int, workers: int, threads: int, **options):
+    """
+    Runs every shard on this machine, `workers` processes at a time, then merges.
+    Several machines sharing the filesystem can instead each run --shard-index
+    for their shards and one of them --merge afterwards.
+    """
+    print(f"🧩 Running {num_shards} shards on {workers} worker processes ({threads} threads each)...")
+    # Spawned workers inherit the thread caps before numpy / torch are imported
+    limit_threads(threads)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(_run_shard, i, num_shards, threads, options) for i in range(num_shards)]
+        for future in futures:
+            future.result()
+
+    merged = merge_shards(OUTPUT_FILE, num_shards)
+    print(f"💾 Merged {merged} results into: {OUTPUT_FILE}")
+
 if __name__ == "__main__":
-    run_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="SentinAL full portfolio analysis")
+    parser.add_argument("--mode", choices=["batch", "columnar"], default="batch",
+                        help="batch: per-entity analysis in slices of 100; columnar: one pass per engine per chunk")
+    parser.add_argument("--chunk-size", type=int, default=5000,
+                        help="Entities per chunk in columnar mode")
+    parser.add_argument("--concurrent", action="store_true",
+                        help="Batch mode: run the credit, sentiment and systemic engines side by side (batched per engine; overlaps native model calls and I/O only)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run from its checkpoint log")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only rescore entities whose input fingerprints changed since the last run")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="Split the portfolio into N shards by a stable hash of the entity ID")
+    parser.add_argument("--shard-index", type=int, default=None,
+                        help="Run only this shard (0-based), e.g. one per machine on a shared filesystem")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Local worker processes when running all shards (default: one per shard, up to the CPU count)")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="BLAS / torch threads per worker process (default: CPUs / workers)")
+    parser.add_argument("--merge", action="store_true",
+                        help="Only merge existing shard outputs into the final results file")
+    parser.add_argument("--log-mode", choices=HotPathLog.MODES, default=None,
+                        help="Per-entity engine logs: verbose (every entity), sampled (1 in N + summaries) "
+                             "or summary (aggregated summaries only); default from the monitoring config")
+    parser.add_argument("--exposure-index", action="store_true", default=None,
+                        help="Build the k-hop exposure index for the dashboard after a successful run "
+                             "(default from systemic_risk.exposure_index.enabled)")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Record per-stage latency histograms and write them to the metrics file")
+    args = parser.parse_args()
+    if args.shards < 1 or (args.shard_index is not None and not 0 <= args.shard_index < args.shards):
+        parser.error("--shard-index must be between 0 and --shards - 1")
+
+    if args.metrics:
+        # Also reaches spawned shard workers through the environment
+        os.environ["SENTINAL_METRICS"] = "1"
+        METRICS.enable()
+
+    options = dict(mode=args.mode, chunk_size=args.chunk_size, concurrent=args.concurrent,
+                   resume=args.resume, incremental=args.incremental, log_mode=args.log_mode,
+                   exposure_index=args.exposure_index)
+    if args.merge:
+        merge_shards(OUTPUT_FILE, args.shards)
+    elif args.shard_index is not None:
+        if args.threads_per_worker:
+            limit_threads(args.threads_per_worker)
+        run_pipeline(shard_index=args.shard_index, num_shards=args.shards, **options)
+    elif args.shards > 1:
+        cpus = os.cpu_count() or 1
+        workers = args.workers or min(args.shards, cpus)
+        threads = args.threads_per_worker or max(1, cpus // workers)
+        run_sharded(args.shards, workers, threads, **options)
+    else:
+        run_pipeline(**options)
\ No newline at end of file
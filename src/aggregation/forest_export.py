@@ -0,0 +1,186 @@
+import json
+import logging
+import os
+import sys
+import numpy as np
+from typing import Dict, Optional
+
+# Add root to path
+sys.path.append(os.getcwd())
+
+logger = logging.getLogger("ForestExport")
+
+class CompiledForest:
+    """
+    A trained random forest classifier flattened into plain NumPy arrays.
+    All trees share one node table (feature / threshold / left / right / value);
+    tree t's root is node `roots[t]` and leaves have left == right == -1.
+
+    predict_proba() walks every tree for every sample at once, one level per step,
+    so a batch costs max_depth vectorized gathers instead of a per-tree estimator call.
+    Like sklearn, inputs are cast to float32 before being compared with the thresholds.
+    Loading needs neither sklearn nor pickle.
+    """
+
+    # Bump whenever the array layout changes
+    FORMAT_VERSION = 1
+    # Samples evaluated together (bounds the samples x trees node matrix)
+    CHUNK_ROWS = 2048
+
+    def __init__(self, arrays: Dict[str, np.ndarray], header: Dict):
+        self.header = header
+        self.roots = arrays['roots']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.value = arrays['value']
+        # children[2 * node + go_right]; leaves point back to themselves so every
+        # tree can take exactly max_depth steps
+        nodes = np.arange(len(self.left))
+        self.children = np.stack([
+            np.where(self.left >= 0, self.left, nodes),
+            np.where(self.right >= 0, self.right, nodes)
+        ], axis=1).ravel()
+        self.classes_ = np.asarray(header['classes'])
+        self.n_features_in_ = header['n_features']
+        self.max_depth = header['max_depth']
+
+    @classmethod
+    def from_sklearn(cls, model) -> "CompiledForest":
+        """Flattens a fitted sklearn RandomForestClassifier (single output)."""
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("Only single-output forests can be compiled")
+
+        roots, feature, threshold, left, right, value = [], [], [], [], [], []
+        offset, max_depth = 0, 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            roots.append(offset)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            left.append(np.where(is_leaf, -1, tree.children_left + offset))
+            right.append(np.where(is_leaf, -1, tree.children_right + offset))
+            # Per-node class distribution, normalized as in DecisionTreeClassifier.predict_proba
+            counts = tree.value[:, 0, :]
+            totals = counts.sum(axis=1, keepdims=True)
+            value.append(np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0))
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        arrays = {
+            'roots': np.array(roots, dtype=np.int64),
+            'feature': np.concatenate(feature).astype(np.int32),
+            'threshold': np.concatenate(threshold).astype(np.float64),
+            'left': np.concatenate(left).astype(np.int64),
+            'right': np.concatenate(right).astype(np.int64),
+            'value': np.concatenate(value).astype(np.float64)
+        }
+        header = {
+            "format_version": cls.FORMAT_VERSION,
+            "n_trees": len(roots),
+            "n_nodes": offset,
+            "n_features": int(model.n_features_in_),
+            "classes": np.asarray(model.classes_).tolist(),
+            "max_depth": int(max_depth)
+        }
+        return cls(arrays, header)
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected an (n, {self.n_features_in_}) feature matrix, got shape {X.shape}")
+
+        proba = np.empty((len(X), len(self.classes_)))
+        for start in range(0, len(X), self.CHUNK_ROWS):
+            block = X[start:start + self.CHUNK_ROWS]
+            flat = block.ravel()
+            offsets = (np.arange(len(block)) * block.shape[1])[:, None]
+            node = np.broadcast_to(self.roots, (len(block), len(self.roots))).copy()
+            for _ in range(self.max_depth):
+                go_right = flat[offsets + self.feature[node]] > self.threshold[node]
+                node = self.children[2 * node + go_right]
+            proba[start:start + len(block)] = self.value[node].mean(axis=1)
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def save(self, path: str):
+        """Writes the versioned array file atomically (temp file + rename)."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(
+                    f,
+                    header=np.array(json.dumps(self.header)),
+                    roots=self.roots,
+                    feature=self.feature,
+                    threshold=self.threshold,
+                    left=self.left,
+                    right=self.right,
+                    value=self.value
+                )
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledForest":
+        with np.load(path, allow_pickle=False) as archive:
+            header = json.loads(str(archive['header']))
+            if header.get("format_version") != cls.FORMAT_VERSION:
+                raise ValueError(f"Compiled forest {path} has format v{header.get('format_version')}, "
+                                 f"expected v{cls.FORMAT_VERSION}")
+            arrays = {name: archive[name] for name in archive.files if name != 'header'}
+        return cls(arrays, header)
+
+def validate_forest(model, compiled: CompiledForest, X: Optional[np.ndarray] = None,
+                    atol: float = 1e-9, seed: int = 42) -> float:
+    """
+    Compares compiled vs sklearn predict_proba and raises if they disagree.
+    Without X, checks random points over the fusion score range (0-100), the
+    exact split thresholds, and the edges of that range.
+    """
+    if X is None:
+        rng = np.random.default_rng(seed)
+        n_features = compiled.n_features_in_
+        thresholds = compiled.threshold[compiled.left >= 0]
+        probes = rng.choice(thresholds, size=(len(thresholds), n_features)) if len(thresholds) else np.zeros((0, n_features))
+        X = np.vstack([
+            rng.uniform(0.0, 100.0, size=(5000, n_features)),
+            probes,
+            np.zeros((1, n_features)),
+            np.full((1, n_features), 100.0)
+        ])
+
+    expected = model.predict_proba(X)
+    actual = compiled.predict_proba(X)
+    max_diff = float(np.abs(expected - actual).max(initial=0.0))
+    if max_diff > atol:
+        raise ValueError(f"Compiled forest disagrees with sklearn (max |diff| = {max_diff:.3g})")
+    return max_diff
+
+def export_forest(model, path: str, X: Optional[np.ndarray] = None) -> CompiledForest:
+    """Compiles a fitted forest, validates it against predict_proba and saves it to `path`."""
+    compiled = CompiledForest.from_sklearn(model)
+    max_diff = validate_forest(model, compiled, X)
+    compiled.save(path)
+    logger.info(f"💾 Compiled forest ({compiled.header['n_trees']} trees, {compiled.header['n_nodes']} nodes) "
+                f"saved to {path} | max |diff| vs sklearn: {max_diff:.2e}")
+    return compiled
+
+if __name__ == "__main__":
+    import pickle
+
+    logging.basicConfig(level=logging.INFO)
+    source = sys.argv[1] if len(sys.argv) > 1 else "models/meta_fusion_model.pkl"
+    target = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(source)[0] + ".npz"
+
+    with open(source, "rb") as f:
+        model = pickle.load(f)
+    export_forest(model, target)
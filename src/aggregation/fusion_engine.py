@@ -3,11 +3,13 @@ import yaml
 import numpy as np
 import os
 import pickle
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
 
 # Import Schema Contracts
 from src.schemas.risk_objects import RiskSignal, AggregatedRiskProfile, RiskLevel, RiskType
+from src.aggregation.forest_export import CompiledForest
+from src.monitoring.metrics import METRICS
 
 class RiskFusionEngine:
     """
@@ -15,6 +17,10 @@ class RiskFusionEngine:
     Aggregates disparate risk signals into a single unified risk profile.
     Supports both Static Weighted Averaging and ML-based Aggregation.
     """
+
+    # Column order of the fusion score matrix (and of the meta-model's training features)
+    FEATURES = [RiskType.CREDIT, RiskType.SYSTEMIC, RiskType.SENTIMENT]
+    LEVELS = np.array([RiskLevel.LOW, RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.CRITICAL], dtype=object)
     
     def __init__(self, use_ml_model: bool = False, model_path: str = "models/meta_fusion_model.pkl"):
         self.logger = logging.getLogger("FusionEngine")
@@ -43,6 +49,19 @@ class RiskFusionEngine:
             return {}
 
     def _load_meta_model(self, path: str):
+        """
+        Prefers the compiled array form of the forest (same name, .npz; see forest_export),
+        which needs neither sklearn nor unpickling. Falls back to the pickled model.
+        """
+        compiled_path = os.path.splitext(path)[0] + ".npz"
+        if os.path.exists(compiled_path):
+            try:
+                model = CompiledForest.load(compiled_path)
+                self.logger.info(f"✅ Loaded compiled Meta-Model from {compiled_path}")
+                return model
+            except Exception as e:
+                self.logger.error(f"❌ Error loading compiled Meta-Model: {e}")
+
         if not os.path.exists(path):
             self.logger.warning(f"⚠️ Meta-Model not found at {path}. Reverting to Static Weights.")
             return None
@@ -55,17 +74,99 @@ class RiskFusionEngine:
             self.logger.error(f"❌ Error loading Meta-Model: {e}")
             return None
 
-    def get_risk_level(self, score: float) -> RiskLevel:
-        """Maps a 0-100 score to a RiskLevel Enum based on Config Thresholds."""
-        thresholds = self.config.get('global', {}).get('risk_thresholds', {
+    def risk_thresholds(self) -> Dict[str, float]:
+        """Risk level cut-offs (0-100 scale) from the global config."""
+        return self.config.get('global', {}).get('risk_thresholds', {
             'low': 25, 'medium': 50, 'high': 75, 'critical': 90
         })
+
+    def get_risk_level(self, score: float) -> RiskLevel:
+        """Maps a 0-100 score to a RiskLevel Enum based on Config Thresholds."""
+        thresholds = self.risk_thresholds()
         
         if score < thresholds['low']: return RiskLevel.LOW
         elif score < thresholds['medium']: return RiskLevel.MEDIUM
         elif score < thresholds['high']: return RiskLevel.HIGH
         else: return RiskLevel.CRITICAL
 
+    def get_risk_levels(self, scores: np.ndarray) -> np.ndarray:
+        """Vectorized get_risk_level(): array of RiskLevel for an array of 0-100 scores."""
+        thresholds = self.risk_thresholds()
+        edges = [thresholds['low'], thresholds['medium'], thresholds['high']]
+        return self.LEVELS[np.searchsorted(edges, scores, side='right')]
+
+    def score_matrix(self, signal_lists: List[List[RiskSignal]]) -> np.ndarray:
+        """
+        Builds the (entities x FEATURES) score matrix from per-entity signal lists.
+        Missing signals are NaN.
+        """
+        matrix = np.full((len(signal_lists), len(self.FEATURES)), np.nan)
+        columns = {risk_type: col for col, risk_type in enumerate(self.FEATURES)}
+        for row, signals in enumerate(signal_lists):
+            for s in signals:
+                if s.risk_type in columns:
+                    matrix[row, columns[s.risk_type]] = s.normalized_score
+        return matrix
+
+    def fuse_scores(self, score_matrix: np.ndarray) -> np.ndarray:
+        """
+        Composite 0-100 score for every row of an (entities x FEATURES) matrix,
+        with one predict_proba call (or one weighted average) for the whole batch.
+        """
+        score_matrix = np.asarray(score_matrix, dtype=np.float64).reshape(-1, len(self.FEATURES))
+        if len(score_matrix) == 0:
+            return np.zeros(0)
+
+        # --- STRATEGY A: ML Model (Random Forest) --- missing signals enter as 0, as in aggregate()
+        if self.model:
+            try:
+                probs = self.model.predict_proba(np.nan_to_num(score_matrix, nan=0.0))
+                return probs[:, 1] * 100.0
+            except Exception as e:
+                self.logger.error(f"ML Prediction failed: {e}. Falling back to weights.")
+                self.model = None # Disable for this run to avoid loops
+
+        # --- STRATEGY B: Static Weighted Average --- renormalized over the signals present
+        weights = np.array([self.weights.get(risk_type.value, 0.0) for risk_type in self.FEATURES])
+        present = ~np.isnan(score_matrix)
+        weighted_sum = np.where(present, score_matrix, 0.0) @ weights
+        total_weight = present @ weights
+        return np.divide(weighted_sum, total_weight, out=np.zeros(len(score_matrix)), where=total_weight > 0)
+
+    def aggregate_many(self, entity_ids: List[str], score_matrix: np.ndarray,
+                       signal_lists: Optional[List[List[RiskSignal]]] = None) -> Dict:
+        """
+        Batch fusion. `score_matrix` is entities x FEATURES (credit, systemic, sentiment; NaN = missing).
+        Returns aligned arrays of composite scores and risk levels; AggregatedRiskProfile
+        objects are only built when the per-entity `signal_lists` are passed.
+        """
+        if len(entity_ids) != len(score_matrix):
+            raise ValueError(f"Got {len(entity_ids)} entity IDs for {len(score_matrix)} score rows")
+
+        with METRICS.timer("fusion", items=len(entity_ids)):
+            final_scores = self.fuse_scores(score_matrix)
+        result = {
+            "entity_ids": list(entity_ids),
+            "composite_risk_scores": np.round(final_scores, 2),
+            "risk_levels": self.get_risk_levels(final_scores)
+        }
+
+        if signal_lists is not None:
+            timestamp = datetime.now()
+            result["profiles"] = [
+                AggregatedRiskProfile(
+                    entity_id=entity_id,
+                    composite_risk_score=float(score),
+                    risk_level=level,
+                    contributing_signals=signals,
+                    timestamp=timestamp
+                )
+                for entity_id, score, level, signals in zip(
+                    entity_ids, result["composite_risk_scores"], result["risk_levels"], signal_lists
+                )
+            ]
+        return result
+
     def aggregate(self, entity_id: str, signals: List[RiskSignal]) -> AggregatedRiskProfile:
         """
         Fuses a list of RiskSignals into one profile.
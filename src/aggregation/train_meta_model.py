@@ -5,8 +5,7 @@ import sys
 import os
 import logging
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report
+from sklearn.model_selection import StratifiedKFold, cross_validate
 
 # Add root to path
 sys.path.append(os.getcwd())
@@ -14,12 +13,51 @@ sys.path.append(os.getcwd())
 from src.credit_risk.engine import CreditRiskEngine
 from src.systemic_risk.engine import SystemicRiskEngine
 from src.sentiment_risk.engine import SentimentRiskEngine
+from src.aggregation.forest_export import export_forest
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("MetaTrainer")
 
-def train_meta_learner():
+# Training settings
+CV_FOLDS = 5
+N_JOBS = -1  # all CPU cores
+NEUTRAL_CREDIT_SCORE = 50.0  # imputed when the credit model cannot score
+NEUTRAL_SENTIMENT_SCORE = 0.0  # same as an entity without news
+
+def build_feature_matrix(df: pd.DataFrame, credit_engine, graph_engine, sentiment_engine) -> np.ndarray:
+    """
+    [Credit, Systemic, Sentiment] score matrix for every row of the unified table
+    (same column order as RiskFusionEngine.FEATURES), with one bulk call per engine.
+    """
+    entity_ids = df['entity_id'].astype(str).tolist()
+
+    # --- FEATURE 1: CREDIT ---
+    try:
+        credit = credit_engine.score_many(df)
+    except Exception as e:
+        logger.warning(f"⚠️ Credit scoring failed ({e}). Imputing neutral scores.")
+        credit = np.full(len(df), NEUTRAL_CREDIT_SCORE)
+
+    # --- FEATURE 2: SYSTEMIC ---
+    try:
+        systemic = graph_engine.score_many(entity_ids)
+    except Exception as e:
+        logger.warning(f"⚠️ Systemic scoring failed ({e}). Using 0.")
+        systemic = np.zeros(len(df))
+
+    # --- FEATURE 3: SENTIMENT --- every distinct headline scored once, reused via the score cache
+    sentiment = np.full(len(df), NEUTRAL_SENTIMENT_SCORE)
+    if sentiment_engine is not None:
+        try:
+            sentiment = sentiment_engine.score_many(entity_ids)
+            sentiment_engine.cache.save()  # the batch path only saves the cache periodically
+        except Exception as e:
+            logger.warning(f"⚠️ Sentiment scoring failed ({e}). Imputing neutral scores.")
+
+    return np.column_stack([credit, systemic, sentiment])
+
+def train_meta_learner(max_samples=None):
     logger.info("🧠 STARTING META-MODEL TRAINING...")
     
     # 1. Load Unified Data
@@ -29,71 +67,48 @@ def train_meta_learner():
         return
 
     df = pd.read_csv(data_path)
+    if max_samples:
+        df = df.sample(min(len(df), max_samples), random_state=42)
     logger.info(f"📂 Loaded {len(df)} records.")
 
-    # 2. Initialize Engines (Fast Mode)
-    # We initialize them just to use their logic if needed, 
-    # but for training a meta-model, we often just need the SCORES.
-    # If your CSV already has 'credit_score', 'graph_score', etc., use those.
-    # Assuming we need to GENERATE scores on the fly:
-    
+    # 2. Initialize Engines
     credit_engine = CreditRiskEngine()
     graph_engine = SystemicRiskEngine()
     graph_engine.ingest_data("data/processed/network_mapped.csv") # Important!
-    sentiment_engine = SentimentRiskEngine()
+    try:
+        sentiment_engine = SentimentRiskEngine()
+    except Exception as e:
+        logger.warning(f"⚠️ Sentiment engine unavailable ({e}). Sentiment feature will be 0.")
+        sentiment_engine = None
 
-    X = []
-    y = []
+    # 3. Generate Training Vectors (bulk, over the whole table)
+    logger.info("⚙️ Generating feature vectors...")
+    X = build_feature_matrix(df, credit_engine, graph_engine, sentiment_engine)
+    y = df['target'].fillna(0).astype(int).to_numpy() if 'target' in df.columns else np.zeros(len(df), dtype=int)
+    # 1 = Default/Risk, 0 = Safe
 
-    # 3. Generate Training Vectors
-    # We limit to 1000 samples for speed during dev
-    sample_df = df.sample(min(len(df), 1000), random_state=42)
-    
-    logger.info("⚙️ Generating feature vectors (this may take time)...")
-    for _, row in sample_df.iterrows():
-        eid = str(row['entity_id'])
-        target = row.get('target', 0) # 1 = Default/Risk, 0 = Safe
-        
-        # --- FEATURE 1: CREDIT ---
-        # Construct simplified feature dict from row
-        feats = {k: float(v) for k,v in row.items() if k in ['roa', 'debt_ratio', 'operating_margin', 'net_income_assets']}
-        try:
-            c_score = credit_engine.analyze(eid, feats).normalized_score
-        except:
-            c_score = 50.0 # Impute neutral
+    # 4. Cross-validate Random Forest
+    clf = RandomForestClassifier(n_estimators=100, max_depth=5, n_jobs=N_JOBS, random_state=42)
+    folds = min(CV_FOLDS, int(np.bincount(y).min())) if len(np.unique(y)) > 1 else 0
+    if folds >= 2:
+        logger.info(f"🌲 Cross-validating Random Forest ({folds} folds)...")
+        cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+        cv_scores = cross_validate(clf, X, y, cv=cv, scoring=['accuracy', 'roc_auc'])
+        logger.info(f"✅ CV Accuracy: {cv_scores['test_accuracy'].mean():.3f} ± {cv_scores['test_accuracy'].std():.3f} | "
+                    f"ROC AUC: {cv_scores['test_roc_auc'].mean():.3f} ± {cv_scores['test_roc_auc'].std():.3f}")
+    else:
+        logger.warning("⚠️ Not enough samples per class for cross-validation. Skipping.")
 
-        # --- FEATURE 2: SYSTEMIC ---
-        try:
-            g_score = graph_engine.analyze(eid).normalized_score
-        except:
-            g_score = 0.0
-
-        # --- FEATURE 3: SENTIMENT ---
-        # Assuming we have a headline column, or we fetch it
-        # For speed in training, we might mock this or use pre-computed sentiment
-        s_score = 0.0 
-        # (Real implementation would fetch news, but that's slow for training loop)
-        
-        # Append [Credit, Systemic, Sentiment]
-        X.append([c_score, g_score, s_score])
-        y.append(target)
-
-    # 4. Train Random Forest
+    # 5. Fit on the full table
     logger.info("🌲 Training Random Forest Classifier...")
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
-    
-    clf = RandomForestClassifier(n_estimators=100, max_depth=5)
-    clf.fit(X_train, y_train)
-    
-    # 5. Evaluate
-    score = clf.score(X_test, y_test)
-    logger.info(f"✅ Model Accuracy: {score:.2f}")
+    clf.fit(X, y)
     
-    # 6. Save
+    # 6. Save (pickle + compiled array form used by RiskFusionEngine)
     os.makedirs("models", exist_ok=True)
     with open("models/meta_fusion_model.pkl", "wb") as f:
         pickle.dump(clf, f)
     logger.info("💾 Meta-Model saved to models/meta_fusion_model.pkl")
+    export_forest(clf, "models/meta_fusion_model.npz")
 
 if __name__ == "__main__":
     train_meta_learner()
\ No newline at end of file
@@ -23,4 +23,12 @@ class ProbabilityCalibrator:
         """
         Converts probability (0.0 - 1.0) to Risk Score (0 - 100).
         """
-        return round(prob * 100.0, 2)
\ No newline at end of file
+        return round(prob * 100.0, 2)
+
+    def calibrate_many(self, raw_scores: np.ndarray) -> np.ndarray:
+        """Vectorized calibrate() for a batch of raw model outputs."""
+        return np.clip(np.asarray(raw_scores, dtype=np.float64), 0.0, 1.0)
+
+    def probabilities_to_scores(self, probs: np.ndarray) -> np.ndarray:
+        """Vectorized probability_to_score()."""
+        return np.round(np.asarray(probs, dtype=np.float64) * 100.0, 2)
\ No newline at end of file
@@ -1,5 +1,7 @@
 import logging
 import xgboost as xgb
+import numpy as np
+import pandas as pd
 import os
 import sys
 from datetime import datetime
@@ -12,6 +14,8 @@ from src.schemas.risk_objects import RiskSignal, RiskType
 from src.credit_risk.features import CreditFeatureEngineer
 from src.credit_risk.calibration import ProbabilityCalibrator
 from src.credit_risk.scoring import RiskScorer
+from src.monitoring.metrics import METRICS
+from src.monitoring.hot_path_log import HotPathLog
 
 class CreditRiskEngine:
     """
@@ -21,6 +25,7 @@ class CreditRiskEngine:
     
     def __init__(self, model_path="models/credit_model.json"):
         self.logger = logging.getLogger("CreditEngine")
+        self.hot_log = HotPathLog(self.logger, "Credit")
         self.model_path = model_path
         self.model = self._load_model()
         
@@ -52,37 +57,71 @@ class CreditRiskEngine:
 
         # 1. Validate & Prepare Features (Gatekeeper)
         # This converts the dict to a DMatrix with the exact correct column order
-        df_features = CreditFeatureEngineer.prepare_for_inference(input_features)
-        dmatrix = xgb.DMatrix(df_features)
+        with METRICS.timer("credit.feature_prep"):
+            df_features = CreditFeatureEngineer.prepare_for_inference(input_features)
+        with METRICS.timer("credit.dmatrix"):
+            dmatrix = xgb.DMatrix(df_features)
 
         # 2. Raw Prediction (Probability of Default)
-        raw_prob = self.model.predict(dmatrix)[0]
+        with METRICS.timer("credit.predict"):
+            raw_prob = self.model.predict(dmatrix)[0]
         
         # 3. Calibration & Scoring
         # Ensure probability is clean (0.0 - 1.0)
         calibrated_prob = self.calibrator.calibrate(raw_prob)
         # Convert to 0-100 Score
         risk_score = self.calibrator.probability_to_score(calibrated_prob)
+
+        # 4. Build Final Signal (Level + Explainability Metadata)
+        signal = self.build_signal(entity_id, input_features, calibrated_prob, risk_score)
+        
+        self.hot_log.record(risk_score, "🔍 Analyzed %s: Score=%s (%s)", entity_id, risk_score, signal.metadata['risk_level_label'])
+        return signal
+
+    def build_signal(self, entity_id: str, input_features: Dict[str, float],
+                     calibrated_prob: float, risk_score: float) -> RiskSignal:
+        """Wraps an already computed PD / score into the standard RiskSignal."""
         # Determine Level (Low/High/Critical)
         risk_level = self.scorer.get_risk_level(risk_score)
 
-        # 4. Construct Metadata (for Explainability)
+        # Construct Metadata (for Explainability)
         metadata = {
             "risk_level_label": risk_level.value,
             "raw_pd_probability": float(calibrated_prob),
             "input_used": input_features
         }
 
-        # 5. Build Final Signal
-        signal = RiskSignal(
+        return RiskSignal(
             entity_id=entity_id,
             risk_type=RiskType.CREDIT,
             raw_score=float(calibrated_prob),
-            normalized_score=risk_score,
+            normalized_score=float(risk_score),
             confidence=0.95,  # Statistical confidence is high for XGBoost
             timestamp=datetime.now(),
             metadata=metadata
         )
-        
-        self.logger.info(f"🔍 Analyzed {entity_id}: Score={risk_score} ({risk_level.value})")
-        return signal
\ No newline at end of file
+
+    def analyze_many(self, df_features: pd.DataFrame) -> pd.DataFrame:
+        """
+        Columnar analyze(): one DMatrix / predict call for every row.
+        Returns a frame aligned with `df_features.index` holding the calibrated
+        probability of default and the 0-100 score.
+        """
+        if not self.model:
+            raise RuntimeError("Credit Model is not loaded. Please train the model first.")
+
+        n = len(df_features)
+        with METRICS.timer("credit.feature_prep", items=n):
+            features = CreditFeatureEngineer.prepare_for_training(df_features).astype(np.float64)
+        with METRICS.timer("credit.dmatrix", items=n):
+            dmatrix = xgb.DMatrix(features)
+        with METRICS.timer("credit.predict", items=n):
+            probabilities = self.calibrator.calibrate_many(self.model.predict(dmatrix))
+        return pd.DataFrame({
+            'probability': probabilities,
+            'score': self.calibrator.probabilities_to_scores(probabilities)
+        }, index=df_features.index)
+
+    def score_many(self, df_features: pd.DataFrame) -> np.ndarray:
+        """Batch version of analyze() that returns only the 0-100 risk scores (one per row)."""
+        return self.analyze_many(df_features)['score'].to_numpy()
\ No newline at end of file
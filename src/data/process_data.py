@@ -2,12 +2,32 @@ import pandas as pd
 import json
 import os
 import re
+import sys
+
+# Ensure root path is accessible
+sys.path.append(os.getcwd())
+
+from src.ingestion.edge_accumulator import EdgeAccumulator
 
 # Settings
 RAW_DIR = 'data/raw'
 PROCESSED_DIR = 'data/processed'
 os.makedirs(PROCESSED_DIR, exist_ok=True)
 
+# Streaming ingestion of the transaction network (PaySim has 6M+ rows)
+NETWORK_CHUNK_ROWS = 500_000
+NETWORK_MAX_TABLE_ROWS = 5_000_000  # aggregated edges held in memory before spilling to disk
+NETWORK_PROGRESS_ROWS = 2_000_000
+STEP_COLUMNS = ['step', 'source_id', 'target_id', 'amount', 'txn_type', 'is_fraud']
+NETWORK_COLUMNS = {
+    'step': 'int32',
+    'type': 'category',
+    'amount': 'float64',
+    'nameOrig': 'object',
+    'nameDest': 'object',
+    'isFraud': 'int8'
+}
+
 def process_credit_data():
     """
     Cleans the Bankruptcy Dataset.
@@ -45,26 +65,45 @@ def process_graph_data():
     """
     Cleans the PaySim Dataset.
     Standardizes Source/Target columns.
+
+    Streams the FULL file in chunks (only the needed columns, explicit dtypes) into:
+      - network_clean.csv: flows aggregated on (source, target). nameOrig is nearly unique
+        per row, so this barely shrinks the raw names; the big reduction comes when
+        unify_data maps them onto Entity IDs. Past NETWORK_MAX_TABLE_ROWS the edge table
+        spills to disk and is written out partition by partition.
+      - network_steps_clean.csv: the per-row flows with the PaySim 'step' (hour), written
+        through chunk by chunk, for the time-window graphs.
     """
     print("[2/3] Processing Transaction Network...")
     try:
-        # Load first 200k rows (loading 6M rows might crash a laptop)
-        df = pd.read_csv(f"{RAW_DIR}/transaction_network.csv", nrows=200000)
-        
-        df = df.rename(columns={
-            'nameOrig': 'source_id',
-            'nameDest': 'target_id',
-            'amount': 'amount',
-            'isFraud': 'is_fraud',
-            'type': 'txn_type'
-        })
-        
-        keep = ['source_id', 'target_id', 'amount', 'txn_type', 'is_fraud']
-        df = df[keep]
-        
+        accumulator = EdgeAccumulator(group_by_step=False, max_table_rows=NETWORK_MAX_TABLE_ROWS)
+        steps_path = f"{PROCESSED_DIR}/network_steps_clean.csv"
+        reader = pd.read_csv(
+            f"{RAW_DIR}/transaction_network.csv",
+            usecols=list(NETWORK_COLUMNS.keys()),
+            dtype=NETWORK_COLUMNS,
+            chunksize=NETWORK_CHUNK_ROWS
+        )
+
+        with open(steps_path, 'w', newline='') as steps_file:
+            for i, chunk in enumerate(reader):
+                chunk = chunk.rename(columns={
+                    'nameOrig': 'source_id',
+                    'nameDest': 'target_id',
+                    'amount': 'amount',
+                    'isFraud': 'is_fraud',
+                    'type': 'txn_type'
+                })
+                before = accumulator.rows_seen
+                accumulator.add(chunk)
+                chunk[STEP_COLUMNS].to_csv(steps_file, index=False, header=i == 0)
+                if accumulator.rows_seen // NETWORK_PROGRESS_ROWS > before // NETWORK_PROGRESS_ROWS:
+                    print(f"   ... {accumulator.rows_seen:,} rows streamed", flush=True)
+
         output_path = f"{PROCESSED_DIR}/network_clean.csv"
-        df.to_csv(output_path, index=False)
-        print(f"   -> Saved {len(df)} transactions to {output_path}")
+        edges = accumulator.write_csv(output_path)
+        print(f"   -> Saved {edges} aggregated edges ({accumulator.rows_seen} transactions) to {output_path}")
+        print(f"   -> Saved per-step flows to {steps_path}")
         
     except Exception as e:
         print(f"   [!] Error processing graph data: {e}")
@@ -0,0 +1,160 @@
+import glob
+import logging
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import Iterator, List, Optional
+
+class EdgeAccumulator:
+    """
+    Incrementally aggregates a transaction stream into a weighted edge list.
+    Entity names are interned to int32 codes once, so the running table only holds
+    compact (code, code, [step], sums) rows. Chunk aggregates are buffered and folded
+    into the table whenever the buffer grows past `compact_rows`.
+
+    Memory is bounded by the number of distinct keys, not by anything smaller than the
+    input. process_data keys on (source, target); with group_by_step the key is
+    (step, source, target), which in PaySim (nameOrig almost unique per row) has about
+    as many keys as rows, so per-step data is written through instead. To cap the table,
+    set `max_table_rows`: once the compacted table grows past it, it is spilled to
+    `spill_partitions` hash-partitioned pickle files, and write_csv() then aggregates
+    and writes one partition at a time. The name index (one entry per distinct entity
+    name) always stays in memory.
+    """
+
+    COLUMNS = ['source_id', 'target_id', 'amount', 'txn_count', 'txn_type', 'is_fraud']
+
+    def __init__(self, group_by_step: bool = True, compact_rows: int = 2_000_000,
+                 max_table_rows: Optional[int] = None, spill_dir: Optional[str] = None,
+                 spill_partitions: int = 16):
+        self.logger = logging.getLogger("EdgeAccumulator")
+        self.keys = (['step'] if group_by_step else []) + ['src', 'dst']
+        self.compact_rows = compact_rows
+        self.max_table_rows = max_table_rows
+        self.spill_dir = spill_dir
+        self.spill_partitions = max(1, spill_partitions)
+
+        self.names = pd.Index([], dtype=object)
+        self.table = None
+        self.pending = []
+        self.pending_rows = 0
+        self.rows_seen = 0
+        self.spills = 0
+
+    def _intern(self, values: pd.Series) -> np.ndarray:
+        codes = self.names.get_indexer(values)
+        missing = codes == -1
+        if missing.any():
+            self.names = self.names.append(pd.Index(pd.unique(values[missing])))
+            codes = self.names.get_indexer(values)
+        return codes.astype(np.int32)
+
+    def _aggregate(self, frame: pd.DataFrame) -> pd.DataFrame:
+        # is_fraud stays a 0/1 flag: an edge is fraudulent if any of its transactions is
+        return frame.groupby(self.keys, sort=False, observed=True).agg(
+            amount=('amount', 'sum'),
+            txn_count=('txn_count', 'sum'),
+            is_fraud=('is_fraud', 'max'),
+            txn_type=('txn_type', 'first')
+        ).reset_index()
+
+    def _compact(self):
+        if not self.pending:
+            return
+        parts = ([self.table] if self.table is not None else []) + self.pending
+        self.table = self._aggregate(pd.concat(parts, ignore_index=True))
+        self.pending = []
+        self.pending_rows = 0
+
+        if self.max_table_rows and len(self.table) > self.max_table_rows:
+            self._spill()
+
+    def _spill(self):
+        """Moves the table to disk, split by a hash of (src, dst) so every key lands in one partition."""
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="edges_")
+        os.makedirs(self.spill_dir, exist_ok=True)
+
+        table = self.table
+        part = (table['src'].to_numpy(np.int64) * 2654435761 + table['dst'].to_numpy(np.int64)) % self.spill_partitions
+        for p, frame in table.groupby(part, sort=False):
+            frame.to_pickle(os.path.join(self.spill_dir, f"part{p:03d}_{self.spills:05d}.pkl"))
+        self.logger.info(f"💾 Spilled {len(table)} edges to {self.spill_dir} (spill {self.spills + 1}).")
+        self.table = None
+        self.spills += 1
+
+    def add(self, chunk: pd.DataFrame):
+        """
+        Chunk columns: source_id, target_id, amount, txn_type, is_fraud (+ step).
+        Already aggregated rows (e.g. network_clean.csv re-keyed on Entity IDs) also
+        carry txn_count, which is summed instead of counting each row once.
+        """
+        frame = pd.DataFrame({
+            'src': self._intern(chunk['source_id']),
+            'dst': self._intern(chunk['target_id']),
+            'amount': chunk['amount'].to_numpy(dtype=np.float64),
+            'txn_count': (chunk['txn_count'].to_numpy(dtype=np.int64) if 'txn_count' in chunk.columns
+                          else np.ones(len(chunk), dtype=np.int64)),
+            'is_fraud': (chunk['is_fraud'].to_numpy(dtype=np.int32) if 'is_fraud' in chunk.columns
+                         else np.zeros(len(chunk), dtype=np.int32)),
+            'txn_type': chunk['txn_type'] if 'txn_type' in chunk.columns else pd.Series([""] * len(chunk))
+        })
+        if 'step' in self.keys:
+            frame.insert(0, 'step', chunk['step'].to_numpy())
+
+        partial = self._aggregate(frame)
+        self.pending.append(partial)
+        self.pending_rows += len(partial)
+        self.rows_seen += len(chunk)
+
+        if self.pending_rows >= self.compact_rows:
+            self._compact()
+
+    def _with_names(self, table: pd.DataFrame) -> pd.DataFrame:
+        names = self.names.to_numpy()
+        table.insert(len(self.keys) - 2, 'source_id', names[table.pop('src').to_numpy()])
+        table.insert(len(self.keys) - 1, 'target_id', names[table.pop('dst').to_numpy()])
+        return table[self.keys[:-2] + self.COLUMNS]
+
+    def _partitions(self) -> Iterator[pd.DataFrame]:
+        """Final edges, one spill partition at a time (the whole table if nothing was spilled)."""
+        self._compact()
+        if not self.spills:
+            if self.table is not None:
+                yield self._with_names(self.table)
+                self.table = None
+            return
+
+        if self.table is not None:
+            self._spill()
+        try:
+            for p in range(self.spill_partitions):
+                files = sorted(glob.glob(os.path.join(self.spill_dir, f"part{p:03d}_*.pkl")))
+                if files:
+                    merged = self._aggregate(pd.concat([pd.read_pickle(f) for f in files], ignore_index=True))
+                    yield self._with_names(merged)
+        finally:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Final aggregated edge list with entity names restored (all of it in memory)."""
+        parts: List[pd.DataFrame] = list(self._partitions())
+        if not parts:
+            return pd.DataFrame(columns=self.keys[:-2] + self.COLUMNS)
+
+        out = pd.concat(parts, ignore_index=True)
+        self.logger.info(f"✅ Aggregated {self.rows_seen} transactions into {len(out)} edges.")
+        return out
+
+    def write_csv(self, path: str) -> int:
+        """Writes the final edge list partition by partition; returns the number of edges."""
+        edges = 0
+        with open(path, 'w', newline='') as f:
+            pd.DataFrame(columns=self.keys[:-2] + self.COLUMNS).to_csv(f, index=False)
+            for part in self._partitions():
+                part.to_csv(f, index=False, header=False)
+                edges += len(part)
+        self.logger.info(f"✅ Aggregated {self.rows_seen} transactions into {edges} edges.")
+        return edges
@@ -1,7 +1,7 @@
 import pandas as pd
 import logging
 import os
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 
 class SentinelDataLoader:
     """
@@ -34,7 +34,11 @@ class SentinelDataLoader:
             self.logger.warning(f"⚠️ Network data missing at {path}. Returning empty.")
             return pd.DataFrame()
         
-        df = pd.read_csv(path)
+        df = self._standardize_network(pd.read_csv(path))
+        self.logger.info(f"✅ Loaded Network Data: {df.shape}")
+        return df
+
+    def _standardize_network(self, df: pd.DataFrame) -> pd.DataFrame:
         df = self._standardize_cols(df)
         
         # Robust renaming for graph columns
@@ -45,9 +49,21 @@ class SentinelDataLoader:
             elif col in ['amt', 'value', 'weight']: rename_map[col] = 'amount'
         
         df.rename(columns=rename_map, inplace=True)
-        self.logger.info(f"✅ Loaded Network Data: {df.shape}")
         return df
 
+    def network_path(self, filename: str = "network_clean.csv") -> str:
+        return os.path.join(self.data_dir, filename)
+
+    def iter_network_data(self, filename: str = "network_clean.csv",
+                          chunk_rows: int = 500_000) -> Iterator[pd.DataFrame]:
+        """Same columns as load_network_data(), streamed in chunks of `chunk_rows` rows."""
+        path = self.network_path(filename)
+        if not os.path.exists(path):
+            self.logger.warning(f"⚠️ Network data missing at {path}. Nothing to stream.")
+            return
+        for chunk in pd.read_csv(path, chunksize=chunk_rows):
+            yield self._standardize_network(chunk)
+
     def load_news_data(self) -> pd.DataFrame:
         path = os.path.join(self.data_dir, "news_clean.csv")
         if not os.path.exists(path):
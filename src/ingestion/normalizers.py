@@ -1,6 +1,9 @@
 import pandas as pd
 import numpy as np
 import logging
+from typing import Callable, Dict, Iterator, Optional
+
+from src.ingestion.edge_accumulator import EdgeAccumulator
 
 class EntityLinker:
     """
@@ -27,6 +30,18 @@ class EntityLinker:
         
         # Get all unique nodes in graph
         unique_nodes = pd.concat([df_network['source'], df_network['target']]).unique()
+        node_map = self.build_node_map(df_credit, unique_nodes)
+
+        # Apply Map
+        df_network['source'] = df_network['source'].map(node_map)
+        df_network['target'] = df_network['target'].map(node_map)
+        
+        self.logger.info("✅ Mapping Complete.")
+        return df_network
+
+    def build_node_map(self, df_credit: pd.DataFrame, unique_nodes) -> Dict:
+        """Raw graph node -> Entity ID: one ID each while they last, random existing IDs for the rest."""
+        unique_nodes = np.asarray(unique_nodes, dtype=object)
         num_nodes = len(unique_nodes)
         
         # Get available Entity IDs
@@ -52,13 +67,70 @@ class EntityLinker:
             assignments = np.concatenate([direct_map, random_fill])
 
         # Create the Dictionary Map instantly
-        node_map = dict(zip(unique_nodes, assignments))
+        return dict(zip(unique_nodes, assignments))
+
+    def stream_network_to_ids(self, df_credit: pd.DataFrame, chunks: Callable[[str], Iterator[pd.DataFrame]],
+                              edges_out: str, steps_out: Optional[str] = None) -> int:
+        """
+        Chunked counterpart of map_network_to_ids() + aggregate_edges() for networks too
+        large to load at once. `chunks(filename)` streams a processed network file
+        (SentinelDataLoader.iter_network_data). Pass 1 collects the raw node names, pass 2
+        maps network_clean.csv onto Entity IDs and re-aggregates it on (source, target)
+        in an EdgeAccumulator; the per-step rows (network_steps_clean.csv) are mapped and
+        written chunk by chunk to `steps_out`.
+
+        Still in memory: the raw-name -> Entity ID map (one entry per distinct raw node)
+        and the mapped (source, target) table, which is bounded by the entity pairs.
+        Returns the number of mapped edges.
+        """
+        self.logger.info("🔗 Mapping Graph Nodes to Entity IDs (streaming)...")
+        seen = {}
+        for chunk in chunks("network_clean.csv"):
+            for column in ('source', 'target'):
+                seen.update(dict.fromkeys(pd.unique(chunk[column].dropna())))
+        node_map = self.build_node_map(df_credit, list(seen))
+        del seen
+
+        accumulator = EdgeAccumulator(group_by_step=False)
+        for chunk in chunks("network_clean.csv"):
+            accumulator.add(self._mapped(chunk, node_map).rename(columns={'source': 'source_id', 'target': 'target_id'}))
+        edges = accumulator.to_frame().rename(columns={'source_id': 'source', 'target_id': 'target'})
+        edges.to_csv(edges_out, index=False)
+
+        if steps_out:
+            rows = 0
+            with open(steps_out, 'w', newline='') as f:
+                for chunk in chunks("network_steps_clean.csv"):
+                    chunk = self.aggregate_edges(self._mapped(chunk, node_map))
+                    chunk.to_csv(f, index=False, header=rows == 0)
+                    rows += len(chunk)
+            self.logger.info(f"💾 Saved {rows} mapped per-step flows to {steps_out}")
 
-        # Apply Map
-        df_network['source'] = df_network['source'].map(node_map)
-        df_network['target'] = df_network['target'].map(node_map)
-        
         self.logger.info("✅ Mapping Complete.")
+        return len(edges)
+
+    @staticmethod
+    def _mapped(chunk: pd.DataFrame, node_map: Dict) -> pd.DataFrame:
+        chunk = chunk.copy()
+        chunk['source'] = chunk['source'].map(node_map)
+        chunk['target'] = chunk['target'].map(node_map)
+        return chunk.dropna(subset=['source', 'target'])
+
+    def aggregate_edges(self, df_network: pd.DataFrame) -> pd.DataFrame:
+        """
+        Collapses flows that now map onto the same (step, source, target) entity pair,
+        so the mapped edge list is written once in its most compact form.
+        """
+        if df_network.empty: return df_network
+
+        keys = [c for c in ['step', 'source', 'target'] if c in df_network.columns]
+        aggregations = {c: 'sum' for c in ['amount', 'txn_count'] if c in df_network.columns}
+        aggregations.update({c: 'max' for c in ['is_fraud'] if c in df_network.columns})  # stays a 0/1 flag
+        aggregations.update({c: 'first' for c in ['txn_type'] if c in df_network.columns})
+
+        before = len(df_network)
+        df_network = df_network.groupby(keys, sort=False).agg(aggregations).reset_index()
+        self.logger.info(f"✅ Aggregated {before} mapped flows into {len(df_network)} edges.")
         return df_network
 
 class FeatureScaler:
@@ -52,7 +52,6 @@ def run_pipeline():
     try:
         logger.info("📂 Loading datasets...")
         df_credit = loader.load_credit_data()
-        df_network = loader.load_network_data()
         df_news = loader.load_news_data()
     except Exception as e:
         logger.error(f"Pipeline Failed: {e}")
@@ -64,12 +63,19 @@ def run_pipeline():
     master_ids = df_credit['entity_id'].tolist()
     
     # 4. Link & Harmonize Data Streams
-    if not df_network.empty:
-        logger.info("🕸️ Linking Network Data (Vectorized)...")
-        df_network = linker.map_network_to_ids(df_credit, df_network)
-        # Save the harmonized network for the Systemic Engine to use later
-        df_network.to_csv("data/processed/network_mapped.csv", index=False)
-        logger.info(f"💾 Saved mapped network data (rows: {len(df_network)})")
+    # The network is streamed in chunks (PaySim has 6M+ rows): (source, target) edges for the
+    # Systemic Engine, per-step flows for the time-window graphs
+    if os.path.exists(loader.network_path()):
+        logger.info("🕸️ Linking Network Data (streaming)...")
+        edges = linker.stream_network_to_ids(
+            df_credit, loader.iter_network_data,
+            edges_out="data/processed/network_mapped.csv",
+            steps_out="data/processed/network_steps_mapped.csv"
+            if os.path.exists(loader.network_path("network_steps_clean.csv")) else None
+        )
+        logger.info(f"💾 Saved mapped network data (rows: {edges})")
+    else:
+        logger.warning("⚠️ Network data missing. Skipping network linking.")
 
     if not df_news.empty:
         logger.info("📰 Linking News Data...")
@@ -0,0 +1,113 @@
+import logging
+import threading
+import time
+import weakref
+from bisect import bisect_right
+from typing import Iterable
+
+# Score bands reported in summaries (0-100 scale, default risk thresholds)
+BAND_EDGES = (25.0, 50.0, 75.0, 90.0)
+BAND_LABELS = ("<25", "25-50", "50-75", "75-90", ">=90")
+
+class HotPathLog:
+    """
+    Per-entity logging policy for the engines' hot paths.
+
+    - verbose: every entity logged at INFO (the historical behaviour)
+    - sampled: every entity at DEBUG, plus one entity in `sample_every` at INFO
+    - summary: per-entity lines only at DEBUG
+
+    In the sampled and summary modes each engine also logs an aggregated INFO line
+    every `summary_every` entities: counts, mean / min / max, score bands and rate.
+    Messages use lazy %-formatting, so suppressed lines cost no string building.
+    The mode is process-wide (configure()) and applies to existing instances too.
+    """
+
+    MODES = ("verbose", "sampled", "summary")
+    mode = "verbose"
+    sample_every = 100
+    summary_every = 1000
+    _instances = weakref.WeakSet()
+
+    @classmethod
+    def configure(cls, mode: str = "verbose", sample_rate: float = 0.01, summary_every: int = 1000):
+        if mode not in cls.MODES:
+            raise ValueError(f"Unknown log mode: {mode} (expected one of {cls.MODES})")
+        cls.mode = mode
+        cls.sample_every = max(1, round(1.0 / sample_rate)) if sample_rate > 0 else 0
+        cls.summary_every = max(1, summary_every)
+
+    @classmethod
+    def flush_all(cls):
+        """Logs the pending partial summary of every instance (e.g. at the end of a run)."""
+        for instance in list(cls._instances):
+            instance.flush()
+
+    def __init__(self, logger: logging.Logger, label: str):
+        self.logger = logger
+        self.label = label
+        self.total = 0
+        self._lock = threading.Lock()
+        self._reset_window()
+        HotPathLog._instances.add(self)
+
+    def _reset_window(self):
+        self.count = 0
+        self.score_sum = 0.0
+        self.score_min = float("inf")
+        self.score_max = float("-inf")
+        self.bands = [0] * len(BAND_LABELS)
+        self.window_start = time.perf_counter()
+
+    def _add(self, score: float):
+        self.count += 1
+        self.total += 1
+        self.score_sum += score
+        self.score_min = min(self.score_min, score)
+        self.score_max = max(self.score_max, score)
+        self.bands[bisect_right(BAND_EDGES, score)] += 1
+
+    def record(self, score: float, msg: str, *args):
+        """One entity: `msg % args` is only built if it is actually emitted."""
+        if HotPathLog.mode == "verbose":
+            self.logger.info(msg, *args)
+            return
+
+        with self._lock:
+            self._add(float(score))
+            sampled = (HotPathLog.mode == "sampled" and HotPathLog.sample_every > 0
+                       and (self.total - 1) % HotPathLog.sample_every == 0)
+            due = self.count >= self.summary_every
+        if sampled:
+            self.logger.info(msg, *args)
+        else:
+            self.logger.debug(msg, *args)
+        if due:
+            self.flush()
+
+    def record_many(self, scores: Iterable[float]):
+        """Batch paths (no per-entity lines): feed the aggregated summaries only."""
+        if HotPathLog.mode == "verbose":
+            return
+        with self._lock:
+            for score in scores:
+                self._add(float(score))
+            due = self.count >= self.summary_every
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self.count == 0:
+                return
+            elapsed = time.perf_counter() - self.window_start
+            count, mean = self.count, self.score_sum / self.count
+            score_min, score_max, bands = self.score_min, self.score_max, self.bands
+            self._reset_window()
+
+        self.logger.info(
+            "📊 %s: %d entities (%d total) | score mean %.2f, min %.2f, max %.2f | bands %s | %.1f entities/s",
+            self.label, count, self.total, mean, score_min, score_max,
+            " ".join(f"{label}:{n}" for label, n in zip(BAND_LABELS, bands)),
+            count / elapsed if elapsed > 0 else 0.0
+        )
@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import threading
+import time
+import yaml
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Dict, Optional
+
+# Histogram bucket upper bounds in seconds (Prometheus `le` labels); +Inf is implicit
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_DISABLED = nullcontext()
+
+class _Stage:
+    __slots__ = ("count", "items", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.items = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+class _Timer:
+    __slots__ = ("registry", "stage", "items", "start")
+
+    def __init__(self, registry: "MetricsRegistry", stage: str, items: int):
+        self.registry = registry
+        self.stage = stage
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.stage, time.perf_counter() - self.start, self.items)
+
+class MetricsRegistry:
+    """
+    Per-stage latency histograms, call counts and item throughput.
+
+        with METRICS.timer("credit.predict", items=len(df)):
+            ...
+
+    Disabled by default: timer() then returns one shared no-op context manager, so an
+    instrumented hot path pays a single attribute check. Enable with enable(),
+    SENTINAL_METRICS=1 or `monitoring.enabled` in configs/model_config.yaml.
+    Snapshots export as JSON (write_json) or Prometheus text format (to_prometheus).
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.logger = logging.getLogger("Metrics")
+        self.enabled = enabled
+        self.started_at = time.time()
+        self._stages: Dict[str, _Stage] = {}
+        self._lock = threading.Lock()
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self.started_at = time.time()
+
+    def timer(self, stage: str, items: int = 1):
+        if not self.enabled:
+            return _DISABLED
+        return _Timer(self, stage, items)
+
+    def observe(self, stage: str, seconds: float, items: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = _Stage()
+            entry.count += 1
+            entry.items += items
+            entry.total += seconds
+            entry.max = max(entry.max, seconds)
+            entry.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def snapshot(self) -> Dict:
+        """Per-stage summary: calls, items, total / mean / max seconds, items per second, buckets."""
+        with self._lock:
+            stages = {
+                name: {
+                    "calls": s.count,
+                    "items": s.items,
+                    "total_seconds": round(s.total, 6),
+                    "mean_seconds": round(s.total / s.count, 6) if s.count else 0.0,
+                    "max_seconds": round(s.max, 6),
+                    "items_per_second": round(s.items / s.total, 2) if s.total > 0 else None,
+                    "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], s.buckets))
+                }
+                for name, s in sorted(self._stages.items())
+            }
+        return {"started_at": self.started_at, "captured_at": time.time(), "stages": stages}
+
+    def to_prometheus(self, prefix: str = "sentinal_stage") -> str:
+        lines = [f"# HELP {prefix}_seconds Wall-clock latency per pipeline stage call.",
+                 f"# TYPE {prefix}_seconds histogram"]
+        items = [f"# HELP {prefix}_items_total Items processed per pipeline stage.",
+                 f"# TYPE {prefix}_items_total counter"]
+        with self._lock:
+            for name, s in sorted(self._stages.items()):
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                cumulative = 0
+                for bound, count in zip([str(b) for b in BUCKETS] + ["+Inf"], s.buckets):
+                    cumulative += count
+                    lines.append(f'{prefix}_seconds_bucket{{stage="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_seconds_sum{{stage="{label}"}} {s.total:.6f}')
+                lines.append(f'{prefix}_seconds_count{{stage="{label}"}} {s.count}')
+                items.append(f'{prefix}_items_total{{stage="{label}"}} {s.items}')
+        return "\n".join(lines + items) + "\n"
+
+    def write_json(self, path: str):
+        """Writes snapshot() atomically (temp file + rename)."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f, indent=2)
+            os.replace(tmp_path, path)
+            self.logger.info(f"📈 Stage metrics written to {path}")
+        except Exception as e:
+            self.logger.error(f"❌ Failed to write metrics: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def log_summary(self, limit: Optional[int] = None):
+        """One log line per stage, slowest total first."""
+        stages = sorted(self.snapshot()["stages"].items(), key=lambda kv: -kv[1]["total_seconds"])
+        for name, s in stages[:limit]:
+            self.logger.info(f"⏱️ {name}: {s['calls']} calls, {s['items']} items, "
+                             f"{s['total_seconds']:.3f}s total, {s['mean_seconds'] * 1000:.2f} ms mean")
+
+# Process-wide registry used by the instrumented stages
+METRICS = MetricsRegistry(enabled=os.environ.get("SENTINAL_METRICS", "").lower() in ("1", "true", "yes"))
+
+def configure_metrics(path: str = "configs/model_config.yaml") -> Dict:
+    """Reads the `monitoring` config section and enables METRICS if it says so; returns the section."""
+    try:
+        with open(path, "r") as f:
+            config = (yaml.safe_load(f) or {}).get("monitoring", {})
+    except Exception:
+        config = {}
+    if config.get("enabled", False):
+        METRICS.enable()
+    return config
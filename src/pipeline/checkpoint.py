@@ -0,0 +1,149 @@
+import json
+import logging
+import os
+from typing import Dict, Iterator, List, Set
+
+class CheckpointLog:
+    """
+    Append-only JSONL checkpoint log for long batch runs.
+
+    Every batch is appended as one record line per result followed by a commit
+    marker, and the file is fsync'd before commit() returns:
+
+        {"batch": 7, "record": {...}}
+        {"batch": 7, "record": {...}}
+        {"batch": 7, "commit": 2}
+
+    Records only count once their commit marker is on disk, so a crash mid-write
+    loses at most the batch in flight. Opening the log truncates any such torn tail.
+    compact() streams the committed records into the consolidated JSON array
+    (atomic temp file + rename), without ever holding the whole run in memory.
+    """
+
+    def __init__(self, path: str = "outputs/final_risk_analysis.ckpt.jsonl", resume: bool = False):
+        self.logger = logging.getLogger("CheckpointLog")
+        self.path = path
+        self.committed_ids: Set[str] = set()
+        self.next_batch = 0
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if resume and os.path.exists(path):
+            valid_bytes = self._recover()
+            self.logger.info(f"⏯️ Resuming from {path}: {len(self.committed_ids)} committed entities "
+                             f"in {self.next_batch} batches.")
+            self._file = open(path, 'r+b')
+            self._file.truncate(valid_bytes)
+            self._file.seek(valid_bytes)
+        else:
+            # Fresh run: start an empty log
+            self._file = open(path, 'wb')
+            self._sync()
+
+    def __len__(self) -> int:
+        return len(self.committed_ids)
+
+    def __enter__(self) -> "CheckpointLog":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _scan(self) -> Iterator[tuple]:
+        """
+        Yields (end_offset, batch, records) for every committed batch, in order.
+        Stops at the first torn or malformed line.
+        """
+        pending, pending_batch, offset = [], None, 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                offset += len(line)
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+
+                batch = entry.get("batch")
+                if pending_batch != batch:
+                    pending, pending_batch = [], batch
+                if "record" in entry:
+                    pending.append(entry["record"])
+                elif "commit" in entry:
+                    if entry["commit"] == len(pending):
+                        yield offset, batch, pending
+                    pending, pending_batch = [], None
+
+    def _recover(self) -> int:
+        """Rebuilds the committed ID set; returns the byte length of the committed prefix."""
+        valid_bytes = 0
+        for end, batch, records in self._scan():
+            valid_bytes = end
+            self.next_batch = batch + 1
+            self.committed_ids.update(str(record.get("entity_id")) for record in records)
+
+        torn = os.path.getsize(self.path) - valid_bytes
+        if torn:
+            self.logger.warning(f"⚠️ Dropping {torn} bytes of uncommitted checkpoint data.")
+        return valid_bytes
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def is_committed(self, entity_id) -> bool:
+        return str(entity_id) in self.committed_ids
+
+    def commit(self, records: List[Dict]):
+        """Appends a batch of result records plus its commit marker, durably (fsync)."""
+        batch = self.next_batch
+        lines = [json.dumps({"batch": batch, "record": record}) for record in records]
+        lines.append(json.dumps({"batch": batch, "commit": len(records)}))
+        self._file.write(("\n".join(lines) + "\n").encode("utf-8"))
+        self._sync()
+
+        self.next_batch += 1
+        self.committed_ids.update(str(record.get("entity_id")) for record in records)
+
+    def records(self) -> Iterator[Dict]:
+        """Committed records in commit order, each entity once (first commit wins)."""
+        seen = set()
+        for _, _, records in self._scan():
+            for record in records:
+                entity_id = str(record.get("entity_id"))
+                if entity_id not in seen:
+                    seen.add(entity_id)
+                    yield record
+
+    def compact(self, output_path: str) -> int:
+        """
+        Writes the committed records as one JSON array to `output_path`
+        (atomic temp file + rename). Returns the number of records written.
+        """
+        self._sync()
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        tmp_path = output_path + ".tmp"
+        count = 0
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write("[")
+                for record in self.records():
+                    f.write(",\n" if count else "\n")
+                    f.write(json.dumps(record, indent=2))
+                    count += 1
+                f.write("\n]" if count else "]")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, output_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.logger.info(f"💾 Compacted {count} records into {output_path}")
+        return count
+
+    def close(self):
+        if not self._file.closed:
+            self._sync()
+            self._file.close()
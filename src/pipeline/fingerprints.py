@@ -0,0 +1,73 @@
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+import scipy.sparse as sp
+from typing import Dict, Iterable, List, Optional
+
+from src.systemic_risk.sparse_graph import SparseGraph
+
+class InputFingerprinter:
+    """
+    Short BLAKE2b digests of everything an engine reads for one entity, so a nightly
+    run can tell which entities actually need rescoring:
+
+    - credit:    the entity's credit feature values
+    - sentiment: the set of headlines mapped to the entity
+    - systemic:  the entity's incoming / outgoing edges (by counterparty name and
+                 weight) plus its blended systemic score, which is how graph-wide
+                 changes (PageRank, normalization) reach an otherwise untouched node
+    - model:     one digest of the model files and scoring settings, shared by all entities
+    """
+
+    def __init__(self, digest_size: int = 16):
+        self.logger = logging.getLogger("Fingerprinter")
+        self.digest_size = digest_size
+
+    def _digest(self, payload: str) -> str:
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=self.digest_size).hexdigest()
+
+    def credit(self, feature_rows: np.ndarray) -> List[str]:
+        """One digest per row of the (entities x features) credit feature matrix."""
+        return [self._digest(",".join(repr(float(v)) for v in row)) for row in np.asarray(feature_rows)]
+
+    def sentiment(self, headline_lists: Iterable[List[str]]) -> List[str]:
+        # Order and duplicates do not change the score inputs
+        return [self._digest("\x1f".join(sorted(set(headlines)))) for headlines in headline_lists]
+
+    def systemic(self, entity_ids: List[str], sparse_graph: SparseGraph, scores: np.ndarray) -> List[str]:
+        adjacency = sparse_graph.adjacency
+        incoming = sp.csr_array(adjacency.T)
+        nodes = sparse_graph.nodes
+
+        def edges(matrix: sp.csr_array, idx: int) -> str:
+            lo, hi = matrix.indptr[idx], matrix.indptr[idx + 1]
+            return ";".join(sorted(f"{nodes[j]}={w!r}" for j, w in zip(matrix.indices[lo:hi], matrix.data[lo:hi].tolist())))
+
+        digests = []
+        for entity_id, score in zip(entity_ids, scores):
+            idx = sparse_graph.node_index.get(entity_id)
+            neighbourhood = "" if idx is None else f"{edges(adjacency, idx)}|{edges(incoming, idx)}"
+            digests.append(self._digest(f"{neighbourhood}|{round(float(score), 2)}"))
+        return digests
+
+    def model_version(self, paths: List[str], settings: Optional[Dict] = None) -> str:
+        """Digest of the model files that exist (missing ones count as absent) and of `settings`."""
+        digest = hashlib.blake2b(digest_size=self.digest_size)
+        for path in paths:
+            digest.update(path.encode("utf-8"))
+            if not os.path.exists(path):
+                continue
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+        digest.update(json.dumps(settings or {}, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def changed(previous: Optional[Dict], current: Dict) -> List[str]:
+        """Names of the fingerprints that differ (all of them when there is no previous record)."""
+        if not previous:
+            return list(current)
+        return [name for name, value in current.items() if previous.get(name) != value]
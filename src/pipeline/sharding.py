@@ -0,0 +1,67 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+from typing import Dict, List
+
+logger = logging.getLogger("Sharding")
+
+# Thread pools that would otherwise each grab every core in every worker process
+THREAD_ENV_VARS = ["OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS",
+                   "NUMEXPR_NUM_THREADS", "VECLIB_MAXIMUM_THREADS"]
+
+def shard_of(entity_id, num_shards: int) -> int:
+    """
+    Stable shard assignment: BLAKE2b of the entity ID (never Python's salted hash()),
+    so every process and every machine agrees on it.
+    """
+    digest = hashlib.blake2b(str(entity_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % num_shards
+
+def shard_path(path: str, shard_index: int, num_shards: int) -> str:
+    """outputs/final_risk_analysis.json -> outputs/final_risk_analysis.shard-002-of-008.json"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard-{shard_index:03d}-of-{num_shards:03d}{ext}"
+
+def limit_threads(threads: int):
+    """
+    Caps the BLAS / OpenMP / torch thread pools of the current process. The environment
+    variables only reach libraries loaded afterwards (and child processes), so set them
+    before spawning workers; torch is capped directly if it is already imported.
+    """
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads)
+
+def merge_shards(output_file: str, num_shards: int) -> int:
+    """
+    Merges every shard's output into `output_file` (atomic temp file + rename).
+    Records are ordered by entity ID so the result does not depend on which shard
+    or machine finished first. Raises if a shard output is missing.
+    """
+    paths = [shard_path(output_file, i, num_shards) for i in range(num_shards)]
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        raise FileNotFoundError(f"Missing shard outputs: {missing}")
+
+    merged: Dict[str, Dict] = {}
+    for path in paths:
+        with open(path, 'r') as f:
+            for record in json.load(f):
+                merged.setdefault(str(record.get("entity_id")), record)
+
+    records: List[Dict] = [merged[entity_id] for entity_id in sorted(merged)]
+    tmp_path = output_file + ".tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(records, f, indent=2)
+        os.replace(tmp_path, output_file)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    logger.info(f"🧷 Merged {num_shards} shards ({len(records)} records) into {output_file}")
+    return len(records)
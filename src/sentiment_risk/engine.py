@@ -1,16 +1,19 @@
 import logging
+import numpy as np
+import pandas as pd
 import sys
 import os
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 # Ensure root path is accessible
 sys.path.append(os.getcwd())
 
 from src.schemas.risk_objects import RiskSignal, RiskType
-from src.sentiment_risk.finbert_inference import FinBERTAnalyzer
 from src.sentiment_risk.news_loader import NewsLoader
 from src.sentiment_risk.stress_overlay import SentimentStressOverlay
+from src.sentiment_risk.score_cache import SentimentScoreCache
+from src.monitoring.hot_path_log import HotPathLog
 
 class SentimentRiskEngine:
     """
@@ -21,13 +24,25 @@ class SentimentRiskEngine:
     4. Outputs a standardized RiskSignal.
     """
     
-    def __init__(self):
+    def __init__(self, analyzer=None, loader: Optional[NewsLoader] = None,
+                 cache: Optional[SentimentScoreCache] = None):
+        """
+        `analyzer` replaces FinBERT with any object exposing predict() / predict_each()
+        (e.g. the tiny stub model used by the benchmarks); `loader` and `cache` can be
+        injected the same way.
+        """
         self.logger = logging.getLogger("SentimentEngine")
+        self.hot_log = HotPathLog(self.logger, "Sentiment")
         
         # Initialize components
-        self.loader = NewsLoader()
-        self.analyzer = FinBERTAnalyzer() # Singleton, loads model once
+        self.loader = loader if loader is not None else NewsLoader()
+        if analyzer is None:
+            # Imported here so injected analyzers work without torch / transformers
+            from src.sentiment_risk.finbert_inference import FinBERTAnalyzer
+            analyzer = FinBERTAnalyzer() # Singleton, loads model once
+        self.analyzer = analyzer
         self.overlay = SentimentStressOverlay()
+        self.cache = cache if cache is not None else SentimentScoreCache()
 
     def analyze(self, entity_id: str) -> RiskSignal:
         """
@@ -37,7 +52,7 @@ class SentimentRiskEngine:
         headlines = self.loader.get_headlines(entity_id)
         
         if not headlines:
-            self.logger.info(f"No news found for {entity_id}. Returning Neutral signal.")
+            self.hot_log.record(0.0, "No news found for %s. Returning Neutral signal.", entity_id)
             return self._create_neutral_signal(entity_id)
 
         # 2. AI Inference (FinBERT)
@@ -50,26 +65,87 @@ class SentimentRiskEngine:
         # 3. Apply Heuristic Stress (Panic Keywords)
         final_score = self.overlay.apply_shock(base_risk, headlines)
         
-        # 4. Construct Metadata
+        # 4. Build Signal
+        signal = self.build_signal(entity_id, bert_scores["negative"], final_score, len(headlines), headlines[0])
+        
+        self.hot_log.record(final_score, "📰 Sentiment Risk for %s: %.2f", entity_id, final_score)
+        return signal
+
+    def build_signal(self, entity_id: str, negative: float, final_score: float,
+                     headline_count: int, top_headline: str) -> RiskSignal:
+        """Wraps already computed sentiment numbers into the standard RiskSignal."""
+        if headline_count == 0:
+            return self._create_neutral_signal(entity_id)
+
         metadata = {
-            "headline_count": len(headlines),
-            "finbert_raw_negative": round(base_risk, 2),
-            "top_headline": headlines[0][:100] + "..." if headlines else ""
+            "headline_count": int(headline_count),
+            "finbert_raw_negative": round(negative * 100.0, 2),
+            "top_headline": top_headline[:100] + "..."
         }
 
-        # 5. Build Signal
-        signal = RiskSignal(
+        return RiskSignal(
             entity_id=entity_id,
             risk_type=RiskType.SENTIMENT,
-            raw_score=bert_scores["negative"], # 0.0 - 1.0
-            normalized_score=final_score,      # 0 - 100 (possibly boosted by overlay)
+            raw_score=float(negative),         # 0.0 - 1.0
+            normalized_score=float(final_score), # 0 - 100 (possibly boosted by overlay)
             confidence=0.90,                   # BERT is generally confident
             timestamp=datetime.now(),
             metadata=metadata
         )
-        
-        self.logger.info(f"📰 Sentiment Risk for {entity_id}: {final_score:.2f}")
-        return signal
+
+    def analyze_many(self, entity_ids: List[str]) -> pd.DataFrame:
+        """
+        Columnar analyze(): one row per entity with the mean FinBERT negative
+        probability, the final 0-100 score, the headline count and the top headline.
+        Each distinct headline is scored once: from the persistent score cache when
+        it has been seen before, otherwise by FinBERT (and then cached).
+        """
+        headline_lists = [self.loader.get_headlines(entity_id) for entity_id in entity_ids]
+        counts = np.array([len(headlines) for headlines in headline_lists], dtype=np.int64)
+        top_headlines = [headlines[0] if headlines else "" for headlines in headline_lists]
+        unique = list(dict.fromkeys(h for headlines in headline_lists for h in headlines))
+        if not unique:
+            return pd.DataFrame({
+                'negative': np.zeros(len(entity_ids)),
+                'score': np.zeros(len(entity_ids)),
+                'headline_count': counts,
+                'top_headline': top_headlines
+            }, index=list(entity_ids))
+
+        # 1. Per-headline probabilities, running the model only on cache misses
+        probs, hits = self.cache.lookup(unique)
+        if not hits.all():
+            missing = [text for text, hit in zip(unique, hits) if not hit]
+            self.logger.info(f"🧠 Scoring {len(missing)} new headlines ({int(hits.sum())} cached)...")
+            fresh = self.analyzer.predict_each(missing)
+            probs[~hits] = fresh
+            self.cache.add(missing, fresh)
+            self.cache.maybe_save()
+
+        # 2. Per-entity mean negative probability + keyword penalties (segment sums)
+        position = {text: i for i, text in enumerate(unique)}
+        owner = np.repeat(np.arange(len(entity_ids)), counts)
+        rows = np.array([position[h] for headlines in headline_lists for h in headlines], dtype=np.int64)
+        negative = probs[:, 1].astype(np.float64)
+        penalty = np.array([self.overlay.headline_penalty(text) for text in unique])
+
+        mean_negative = np.bincount(owner, weights=negative[rows], minlength=len(entity_ids))
+        np.divide(mean_negative, counts, out=mean_negative, where=counts > 0)
+        total_penalty = np.bincount(owner, weights=penalty[rows], minlength=len(entity_ids))
+
+        # 3. Same combination as apply_shock(); entities without news stay neutral (0)
+        scores = np.minimum(mean_negative * 100.0 + total_penalty, 100.0)
+        scores[counts == 0] = 0.0
+        return pd.DataFrame({
+            'negative': mean_negative,
+            'score': scores,
+            'headline_count': counts,
+            'top_headline': top_headlines
+        }, index=list(entity_ids))
+
+    def score_many(self, entity_ids: List[str]) -> np.ndarray:
+        """Batch version of analyze() returning only the 0-100 scores (one per entity)."""
+        return self.analyze_many(entity_ids)['score'].to_numpy()
 
     def _create_neutral_signal(self, entity_id: str) -> RiskSignal:
         """Fallback for when no news exists."""
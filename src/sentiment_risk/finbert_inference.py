@@ -4,6 +4,8 @@ from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import numpy as np
 from typing import List, Dict
 
+from src.monitoring.metrics import METRICS
+
 class FinBERTAnalyzer:
     """
     Singleton wrapper for the ProsusAI/finbert model.
@@ -41,6 +43,25 @@ class FinBERTAnalyzer:
         if not texts:
             return {"positive": 0.0, "negative": 0.0, "neutral": 1.0}
 
+        all_probs = self.predict_each(texts)
+        if len(all_probs) == 0:
+            return {"positive": 0.0, "negative": 0.0, "neutral": 1.0}
+        
+        # Calculate Mean Sentiment across all headlines
+        # FinBERT Output Order: [Positive, Negative, Neutral]
+        mean_probs = all_probs.mean(axis=0)
+        
+        return {
+            "positive": float(mean_probs[0]),
+            "negative": float(mean_probs[1]),
+            "neutral":  float(mean_probs[2])
+        }
+
+    def predict_each(self, texts: List[str]) -> np.ndarray:
+        """
+        Per-text sentiment probabilities as an (n_texts x 3) array,
+        columns in FinBERT order [Positive, Negative, Neutral].
+        """
         # Batch processing (e.g. process 16 headlines at a time)
         # This prevents crashing if an entity has 1000 headlines.
         batch_size = 16
@@ -49,15 +70,16 @@ class FinBERTAnalyzer:
         for i in range(0, len(texts), batch_size):
             batch_texts = texts[i : i + batch_size]
             
-            inputs = self.tokenizer(
-                batch_texts, 
-                return_tensors="pt", 
-                padding=True, 
-                truncation=True, 
-                max_length=128
-            ).to(self.device)
+            with METRICS.timer("finbert.tokenize", items=len(batch_texts)):
+                inputs = self.tokenizer(
+                    batch_texts, 
+                    return_tensors="pt", 
+                    padding=True, 
+                    truncation=True, 
+                    max_length=128
+                ).to(self.device)
             
-            with torch.no_grad():
+            with METRICS.timer("finbert.forward", items=len(batch_texts)), torch.no_grad():
                 outputs = self.model(**inputs)
                 # Apply Softmax to get probabilities (Logits -> 0.0-1.0)
                 probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
@@ -65,16 +87,5 @@ class FinBERTAnalyzer:
 
         # Concatenate all batches
         if not all_probs:
-            return {"positive": 0.0, "negative": 0.0, "neutral": 1.0}
-            
-        all_probs = np.concatenate(all_probs, axis=0)
-        
-        # Calculate Mean Sentiment across all headlines
-        # FinBERT Output Order: [Positive, Negative, Neutral]
-        mean_probs = all_probs.mean(axis=0)
-        
-        return {
-            "positive": float(mean_probs[0]),
-            "negative": float(mean_probs[1]),
-            "neutral":  float(mean_probs[2])
-        }
\ No newline at end of file
+            return np.zeros((0, 3), dtype=np.float32)
+        return np.concatenate(all_probs, axis=0)
\ No newline at end of file
@@ -0,0 +1,96 @@
+import hashlib
+import logging
+import os
+import time
+import numpy as np
+from typing import List, Tuple
+
+class SentimentScoreCache:
+    """
+    Persistent per-headline FinBERT probabilities ([Positive, Negative, Neutral]),
+    keyed on the SHA-1 of model name + headline text. A headline is scored once and
+    reused across runs and entities; only unseen headlines ever reach the model.
+
+    Hot paths call maybe_save(), which only rewrites the file once `flush_rows` new
+    headlines have piled up or `flush_seconds` have passed since the last save;
+    owners call save() at shutdown / end of run to flush the rest.
+    """
+
+    def __init__(self, path: str = "data/cache/sentiment_scores.npz", model_name: str = "ProsusAI/finbert",
+                 flush_rows: int = 5000, flush_seconds: float = 300.0):
+        self.logger = logging.getLogger("SentimentCache")
+        self.path = path
+        self.model_name = model_name
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.index = {}
+        self.probs = np.zeros((0, 3), dtype=np.float32)
+        self.dirty = False
+        self.unsaved = 0
+        self.last_save = time.monotonic()
+        self._load()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as snapshot:
+                keys = snapshot['keys'].tolist()
+                self.probs = snapshot['probs'].astype(np.float32)
+            self.index = {key: i for i, key in enumerate(keys)}
+            self.logger.info(f"⚡ Loaded {len(keys)} cached headline scores from {self.path}")
+        except Exception as e:
+            self.logger.warning(f"⚠️ Ignoring unreadable sentiment cache {self.path}: {e}")
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def lookup(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (probs, hit_mask); rows for cache misses are NaN."""
+        rows = np.array([self.index.get(self._key(text), -1) for text in texts], dtype=np.int64)
+        hits = rows >= 0
+        probs = np.full((len(texts), 3), np.nan, dtype=np.float32)
+        probs[hits] = self.probs[rows[hits]]
+        return probs, hits
+
+    def add(self, texts: List[str], probs: np.ndarray):
+        new_rows = []
+        for text, row in zip(texts, np.asarray(probs, dtype=np.float32)):
+            key = self._key(text)
+            if key not in self.index:
+                self.index[key] = len(self.probs) + len(new_rows)
+                new_rows.append(row)
+        if new_rows:
+            self.probs = np.vstack([self.probs, np.stack(new_rows)])
+            self.dirty = True
+            self.unsaved += len(new_rows)
+
+    def maybe_save(self):
+        """save(), but only when enough new headlines piled up or the last save is old enough."""
+        if self.dirty and (self.unsaved >= self.flush_rows
+                           or time.monotonic() - self.last_save >= self.flush_seconds):
+            self.save()
+
+    def save(self):
+        """Writes the cache atomically (temp file + rename) if anything was added."""
+        if not self.dirty:
+            return
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        keys = sorted(self.index, key=self.index.get)
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, keys=np.array(keys, dtype=str), probs=self.probs)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+            self.unsaved = 0
+            self.last_save = time.monotonic()
+            self.logger.info(f"💾 Sentiment cache saved to {self.path} ({len(keys)} headlines)")
+        except Exception as e:
+            self.logger.error(f"❌ Failed to write sentiment cache: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
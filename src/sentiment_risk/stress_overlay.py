@@ -15,6 +15,18 @@ class SentimentStressOverlay:
             "default", "sanctions", "embezzlement", "raid", "jail"
         ]
 
+    # Risk points added per panic keyword found in a headline
+    KEYWORD_PENALTY = 20.0
+
+    def find_keywords(self, text: str) -> List[str]:
+        """Panic keywords contained in one headline."""
+        text_lower = text.lower()
+        return [word for word in self.panic_keywords if word in text_lower]
+
+    def headline_penalty(self, text: str) -> float:
+        """Penalty one headline contributes to apply_shock()."""
+        return self.KEYWORD_PENALTY * len(self.find_keywords(text))
+
     def apply_shock(self, base_risk_score: float, headlines: List[str]) -> float:
         """
         Adjusts the ML-based risk score based on keyword severity.
@@ -26,12 +38,10 @@ class SentimentStressOverlay:
         found_keywords = []
 
         for text in headlines:
-            text_lower = text.lower()
-            for word in self.panic_keywords:
-                if word in text_lower:
-                    # Critical keywords add a massive penalty
-                    penalty += 20.0
-                    found_keywords.append(word)
+            # Critical keywords add a massive penalty
+            found = self.find_keywords(text)
+            penalty += self.KEYWORD_PENALTY * len(found)
+            found_keywords.extend(found)
 
         # If we found panic words, we log it
         if penalty > 0:
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+class ServiceOverloaded(Exception):
+    """The request queue is full; the caller should back off and retry."""
+
+class DeadlineExceeded(Exception):
+    """The request's deadline passed before a result was ready."""
+
+class MicroBatcher:
+    """
+    Collects individually submitted requests into micro-batches for a batch handler.
+
+    A batch is closed when it reaches `max_batch_size` or `max_wait_ms` after its first
+    request arrived, whichever comes first. The handler (a blocking function taking a
+    list of items and returning one result per item; an Exception instance fails just
+    that item) runs on a single worker thread, so the event loop keeps accepting
+    requests while the engines work and the engines are never called concurrently.
+
+    Backpressure: at most `max_queue` requests wait; submit() raises ServiceOverloaded
+    beyond that. Requests whose deadline has passed are dropped before reaching the handler.
+    """
+
+    def __init__(self, handler: Callable[[List[Any]], List[Any]], max_batch_size: int = 64,
+                 max_wait_ms: float = 10.0, max_queue: int = 1024):
+        self.logger = logging.getLogger("MicroBatcher")
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue = max_queue
+
+        self.queue: Optional[asyncio.Queue] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"requests": 0, "batches": 0, "rejected": 0, "expired": 0, "failed": 0}
+
+    async def start(self):
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scoring")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.executor:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize() if self.queue else 0
+
+    async def submit(self, item: Any, timeout: float) -> Any:
+        """Queues one request and waits up to `timeout` seconds for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        try:
+            self.queue.put_nowait((item, future, loop.time() + timeout))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise ServiceOverloaded(f"Request queue full ({self.max_queue} waiting)")
+
+        self.stats["requests"] += 1
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.stats["expired"] += 1
+            raise DeadlineExceeded(f"No result within {timeout * 1000:.0f} ms")
+
+    async def _collect(self) -> List[tuple]:
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        closes_at = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = closes_at - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Skip requests whose caller already gave up (deadline passed / cancelled)
+            now = loop.time()
+            live = [(item, future) for item, future, deadline in batch if not future.done() and deadline > now]
+            if not live:
+                continue
+
+            self.stats["batches"] += 1
+            try:
+                results = await loop.run_in_executor(self.executor, self.handler, [item for item, _ in live])
+            except Exception as e:
+                self.logger.error(f"❌ Batch of {len(live)} failed: {e}", exc_info=True)
+                self.stats["failed"] += len(live)
+                results = [e] * len(live)
+
+            for (_, future), result in zip(live, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def snapshot(self) -> Dict:
+        return dict(self.stats, queue_depth=self.depth, max_batch_size=self.max_batch_size,
+                    max_wait_ms=self.max_wait * 1000.0)
@@ -0,0 +1,50 @@
+import asyncio
+import json
+from typing import Dict, Optional, Tuple
+
+class ScoringClient:
+    """
+    Small stdlib asyncio client for the scoring service (one connection per request),
+    for local testing and load checks:
+
+        status, body = await ScoringClient(port=8080).score("ENT-001")
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, timeout: float = 5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    async def _request(self, method: str, path: str, payload: Optional[Dict] = None) -> Tuple[int, Dict]:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        try:
+            head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                    f"Connection: close\r\n\r\n")
+            writer.write(head.encode("latin-1") + body)
+            await writer.drain()
+            raw = await asyncio.wait_for(reader.read(), self.timeout)
+        finally:
+            writer.close()
+
+        head, _, data = raw.partition(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        if b"content-type: application/json" not in head.lower():
+            return status, data.decode("utf-8")
+        return status, json.loads(data) if data else {}
+
+    async def score(self, entity_id: str, features: Optional[Dict[str, float]] = None,
+                    deadline_ms: Optional[float] = None) -> Tuple[int, Dict]:
+        payload = {"entity_id": entity_id}
+        if features is not None:
+            payload["features"] = features
+        if deadline_ms is not None:
+            payload["deadline_ms"] = deadline_ms
+        return await self._request("POST", "/score", payload)
+
+    async def health(self) -> Tuple[int, Dict]:
+        return await self._request("GET", "/health")
+
+    async def metrics(self) -> Tuple[int, str]:
+        return await self._request("GET", "/metrics")
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import pandas as pd
+import yaml
+from typing import Dict, List, Optional, Tuple, Union
+
+# Add root to path
+sys.path.append(os.getcwd())
+
+from src.credit_risk.features import CreditFeatureEngineer
+from src.monitoring.metrics import METRICS, configure_metrics
+from src.service.batcher import DeadlineExceeded, MicroBatcher, ServiceOverloaded
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+           504: "Gateway Timeout"}
+
+class UnknownEntity(Exception):
+    """No features were supplied and the entity is not in the loaded credit frame (404)."""
+
+class InvalidFeatures(Exception):
+    """The supplied credit features are incomplete (400)."""
+
+class ScoringService:
+    """
+    Minimal asyncio HTTP/1.1 scoring service around SentinAL (stdlib only).
+
+        POST /score   {"entity_id": "...", "features": {...}?, "deadline_ms": 800?}
+        GET  /health
+        GET  /metrics  per-stage timing histograms (Prometheus text format)
+
+    Requests are micro-batched (MicroBatcher) and each batch goes through
+    SentinAL.analyze_portfolio(), i.e. one pass per engine. Credit features come
+    from the request or, when omitted, from the loaded credit frame.
+    Overload answers 503 (with Retry-After), a missed deadline 504.
+    """
+
+    MAX_BODY_BYTES = 1 << 20
+
+    def __init__(self, app, df_credit: Optional[pd.DataFrame] = None, config: Optional[Dict] = None):
+        self.logger = logging.getLogger("ScoringService")
+        self.app = app
+        self.config = config or {}
+        self.host = self.config.get("host", "127.0.0.1")
+        self.port = self.config.get("port", 8080)
+        self.default_deadline_ms = self.config.get("default_deadline_ms", 1000)
+
+        # Known entities' credit features, by string ID
+        self.features = {}
+        if df_credit is not None and not df_credit.empty:
+            frame = CreditFeatureEngineer.prepare_for_training(df_credit).astype(float)
+            self.features = {str(k): v for k, v in frame.to_dict('index').items()}
+
+        self.batcher = MicroBatcher(
+            self.score_batch,
+            max_batch_size=self.config.get("max_batch_size", 64),
+            max_wait_ms=self.config.get("max_wait_ms", 10),
+            max_queue=self.config.get("max_queue", 1024)
+        )
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    def score_batch(self, requests: List[Dict]) -> List:
+        """Batch handler (worker thread): one analyze_portfolio() call for the whole micro-batch."""
+        results: List = [None] * len(requests)
+        rows, ids, positions = [], [], []
+        for i, request in enumerate(requests):
+            entity_id = request["entity_id"]
+            feats = request.get("features") or self.features.get(entity_id)
+            if feats is None:
+                results[i] = UnknownEntity(f"Unknown entity {entity_id} and no features supplied")
+                continue
+            missing = [f for f in CreditFeatureEngineer.FEATURES if f not in feats]
+            if missing:
+                results[i] = InvalidFeatures(f"Missing credit features: {missing}")
+                continue
+            try:
+                rows.append({f: float(feats[f]) for f in CreditFeatureEngineer.FEATURES})
+            except (TypeError, ValueError) as e:
+                results[i] = InvalidFeatures(f"Non-numeric credit feature: {e}")
+                continue
+            ids.append(entity_id)
+            positions.append(i)
+
+        if rows:
+            with METRICS.timer("service.batch", items=len(rows)):
+                profiles = self.app.analyze_portfolio(pd.DataFrame(rows, index=ids))
+            for i, profile in zip(positions, profiles):
+                results[i] = profile
+        return results
+
+    async def start(self):
+        await self.batcher.start()
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.logger.info(f"🌐 Scoring service listening on http://{self.host}:{self.port}")
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        await self.batcher.stop()
+        # Headline scores are only saved periodically on the batch path
+        self.app.flush_caches()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        method, path, _ = request_line.split(" ", 2)
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0))
+        if length > self.MAX_BODY_BYTES:
+            raise OverflowError(f"Body of {length} bytes exceeds {self.MAX_BODY_BYTES}")
+        body = await reader.readexactly(length) if length else b""
+        return method, path, body
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Union[Dict, str]]:
+        if path == "/metrics":
+            return 200, METRICS.to_prometheus()
+        if path == "/health":
+            return 200, {"status": "ok", "known_entities": len(self.features), "batcher": self.batcher.snapshot()}
+        if path != "/score":
+            return 404, {"error": f"No route for {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST /score"}
+
+        try:
+            request = json.loads(body or b"{}")
+            entity_id = str(request["entity_id"])
+            deadline_ms = float(request.get("deadline_ms", self.default_deadline_ms))
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": f"Invalid request: {e}"}
+
+        item = {"entity_id": entity_id, "features": request.get("features")}
+        try:
+            return 200, await self.batcher.submit(item, deadline_ms / 1000.0)
+        except ServiceOverloaded as e:
+            return 503, {"error": str(e)}
+        except DeadlineExceeded as e:
+            return 504, {"error": str(e)}
+        except UnknownEntity as e:
+            return 404, {"error": str(e)}
+        except InvalidFeatures as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            self.logger.error(f"❌ Scoring failed for {entity_id}: {e}", exc_info=True)
+            return 500, {"error": str(e)}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            try:
+                method, path, body = await self._read_request(reader)
+            except OverflowError as e:
+                status, payload = 413, {"error": str(e)}
+            except (ValueError, asyncio.IncompleteReadError):
+                status, payload = 400, {"error": "Malformed HTTP request"}
+            else:
+                status, payload = await self._route(method, path, body)
+
+            if isinstance(payload, str):
+                data, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+            else:
+                data, content_type = json.dumps(payload, default=str).encode("utf-8"), "application/json"
+            headers = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                       f"Content-Type: {content_type}",
+                       f"Content-Length: {len(data)}",
+                       "Connection: close"]
+            if status == 503:
+                headers.append("Retry-After: 1")
+            writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + data)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+def load_service_config(path: str = "configs/model_config.yaml") -> Dict:
+    try:
+        with open(path, "r") as f:
+            return (yaml.safe_load(f) or {}).get("service", {})
+    except Exception:
+        return {}
+
+if __name__ == "__main__":
+    from main import SentinAL
+    from src.ingestion.loaders import SentinelDataLoader
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    configure_metrics()
+    df_credit = SentinelDataLoader(data_dir="data/processed").load_credit_data()
+    if 'entity_id' in df_credit.columns:
+        df_credit.set_index('entity_id', inplace=True)
+
+    service = ScoringService(SentinAL(), df_credit, load_service_config())
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
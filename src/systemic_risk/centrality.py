@@ -1,22 +1,45 @@
 import networkx as nx
+import numpy as np
 import logging
 import yaml
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+
+from src.systemic_risk.sparse_graph import SparseGraph
+from src.systemic_risk.sparse_centrality import SparseCentralityEngine
+from src.systemic_risk.betweenness import ParallelBetweenness
 
 class CentralityCalculator:
     """
-    Calculates network importance metrics (PageRank, Degree, Betweenness).
+    Calculates network importance metrics (PageRank, Degree, Betweenness, Eigenvector).
     Optimized for bulk calculation to avoid re-running expensive graph algos per query.
+    Scores are held as vectors aligned with `self.nodes` for O(1) array lookups.
     """
-    
+
     def __init__(self, config_path="configs/model_config.yaml"):
         self.logger = logging.getLogger("CentralityCalc")
         self.config = self._load_config(config_path)
-        
-        # Cache for scores
-        self.pagerank_scores = {}
-        self.degree_scores = {}
-        self.betweenness_scores = {}
+
+        solver_cfg = self.config.get('power_iteration', {})
+        self.solver = SparseCentralityEngine(
+            tol=solver_cfg.get('tol', 1e-6),
+            max_iter=solver_cfg.get('max_iter', 100)
+        )
+
+        # 'approximate' = error-targeted parallel sampling, 'sampled' = legacy fixed k=100
+        bet_cfg = self.config.get('betweenness', {})
+        self.betweenness_mode = bet_cfg.get('mode', 'sampled')
+        self.betweenness = ParallelBetweenness(
+            epsilon=bet_cfg.get('epsilon', 0.05),
+            delta=bet_cfg.get('delta', 0.1),
+            max_samples=bet_cfg.get('max_samples', 5000),
+            workers=bet_cfg.get('workers'),
+            seed=bet_cfg.get('seed', 42)
+        )
+
+        # Cache for scores (name -> vector aligned with self.nodes)
+        self.nodes = []
+        self.node_index = {}
+        self.scores = {}
 
     def _load_config(self, path):
         try:
@@ -25,61 +48,164 @@ class CentralityCalculator:
         except FileNotFoundError:
             return {}
 
-    def compute_all_metrics(self, graph: nx.DiGraph):
+    def _previous_vector(self, metric: str, nodes: List[str]) -> Optional[np.ndarray]:
+        """Re-aligns the last computed vector to a (possibly grown) node list for warm starts."""
+        previous = self.scores.get(metric)
+        if previous is None or not self.nodes:
+            return None
+        aligned = np.zeros(len(nodes))
+        for i, node in enumerate(nodes):
+            j = self.node_index.get(node)
+            if j is not None:
+                aligned[i] = previous[j]
+        return aligned
+
+    def compute_all_metrics(self, graph: Optional[nx.DiGraph], sparse_graph: Optional[SparseGraph] = None,
+                            warm_start: bool = False):
         """
         Runs heavy graph algorithms ONCE for the entire network.
         Must be called after building the graph.
+        `graph` may be None when only the CSR view exists (e.g. loaded from a snapshot).
+        Pass `warm_start=True` to seed the power iterations with the previous vectors.
         """
-        if graph.number_of_nodes() == 0:
+        sparse_graph = sparse_graph or SparseGraph.from_networkx(graph)
+        if sparse_graph.number_of_nodes == 0:
             return
 
         self.logger.info("🧮 Computing Network Centrality Metrics...")
-        
+        nodes = sparse_graph.nodes
+        adjacency = sparse_graph.adjacency
+        enabled = self.config.get('centrality_metrics', ['pagerank', 'betweenness', 'eigenvector'])
+        scores = {}
+
         # 1. PageRank (Liquidity Importance)
         damping = self.config.get('damping_factor', 0.85)
+        x0 = self._previous_vector('pagerank', nodes) if warm_start else None
         try:
-            self.pagerank_scores = nx.pagerank(graph, weight='weight', alpha=damping)
+            scores['pagerank'] = self.solver.pagerank(adjacency, alpha=damping, x0=x0)
+            self.logger.info(f"   PageRank converged in {self.solver.iterations['pagerank']} iterations.")
         except Exception as e:
             self.logger.error(f"PageRank failed: {e}")
-            self.pagerank_scores = {n: 0.0 for n in graph.nodes()}
+            scores['pagerank'] = np.zeros(len(nodes))
 
         # 2. Degree Centrality (Connectivity)
-        self.degree_scores = nx.degree_centrality(graph)
-        
-        # 3. Betweenness (Bridge Nodes) - Expensive, so we might skip on huge graphs
-        # We limit k (samples) for speed if graph is huge
-        k_val = min(100, len(graph)) if len(graph) > 500 else None
-        self.betweenness_scores = nx.betweenness_centrality(graph, k=k_val)
+        # Same definition as nx.degree_centrality: (in + out) / (n - 1)
+        n = len(nodes)
+        degree = (sparse_graph.out_degree() + sparse_graph.in_degree()).astype(np.float64)
+        scores['degree'] = degree / (n - 1) if n > 1 else np.ones(n)
 
+        # 3. Eigenvector (Influence via well-connected counterparties)
+        if 'eigenvector' in enabled:
+            x0 = self._previous_vector('eigenvector', nodes) if warm_start else None
+            scores['eigenvector'] = self.solver.eigenvector(adjacency, x0=x0)
+            self.logger.info(f"   Eigenvector converged in {self.solver.iterations['eigenvector']} iterations.")
+
+        # 4. Betweenness (Bridge Nodes) - Expensive, so we might skip on huge graphs
+        if 'betweenness' in enabled and self.betweenness_mode == 'approximate':
+            # Sample count follows from the (epsilon, delta) target; sources run in a process pool
+            scores['betweenness'] = self.betweenness.compute(adjacency)
+        elif 'betweenness' in enabled:
+            # We limit k (samples) for speed if graph is huge
+            graph = graph if graph is not None else sparse_graph.to_networkx()
+            k_val = min(100, len(graph)) if len(graph) > 500 else None
+            betweenness = nx.betweenness_centrality(graph, k=k_val)
+            scores['betweenness'] = np.array([betweenness.get(node, 0.0) for node in nodes])
+
+        self.nodes = nodes
+        self.node_index = sparse_graph.node_index
+        self.scores = scores
         self.logger.info("✅ Network Metrics Computed.")
 
+    def update_metrics(self, graph: nx.DiGraph, sparse_graph: SparseGraph, delta_info: Dict):
+        """
+        Incremental refresh after SparseGraph.apply_delta():
+          - PageRank / Eigenvector are re-solved warm-started from the previous vectors,
+            which typically converges in a handful of iterations.
+          - Degree counts change only at the endpoints of created / removed edges.
+          - Betweenness is kept as-is (new nodes start at 0) until the next full compute.
+        """
+        nodes = sparse_graph.nodes
+        n, n_old = len(nodes), delta_info["n_old"]
+        if n_old <= 1 or not self.scores:
+            self.compute_all_metrics(graph, sparse_graph)
+            return
+
+        if self.nodes == nodes[:n_old]:
+            scores = {name: np.concatenate([v, np.zeros(n - len(v))]) for name, v in self.scores.items()}
+        else:
+            scores = {name: self._previous_vector(name, nodes) for name in self.scores}
+
+        # 1. Warm-started power iterations
+        damping = self.config.get('damping_factor', 0.85)
+        scores['pagerank'] = self.solver.pagerank(sparse_graph.adjacency, alpha=damping, x0=scores.get('pagerank'))
+        if 'eigenvector' in scores:
+            scores['eigenvector'] = self.solver.eigenvector(sparse_graph.adjacency, x0=scores['eigenvector'])
+        self.logger.info(f"   Warm-started PageRank converged in {self.solver.iterations['pagerank']} iterations.")
+
+        # 2. Degree: recover raw counts, apply the edge-count changes, renormalize
+        raw = np.rint(scores['degree'] * (n_old - 1))
+        change = delta_info["exists"].astype(np.float64) - delta_info["existed"].astype(np.float64)
+        np.add.at(raw, delta_info["rows"], change)
+        np.add.at(raw, delta_info["cols"], change)
+        scores['degree'] = raw / (n - 1)
+
+        self.nodes = nodes
+        self.node_index = sparse_graph.node_index
+        self.scores = scores
+
+    def risk_score_vector(self) -> np.ndarray:
+        """Vectorized get_risk_score() for every node in self.nodes."""
+        zeros = np.zeros(len(self.nodes))
+        raw_score = (self.scores.get('pagerank', zeros) * 50.0) + (self.scores.get('degree', zeros) * 30.0) \
+            + (self.scores.get('betweenness', zeros) * 20.0)
+        return np.round(np.minimum(raw_score * 100, 100.0), 2)
+
+    def export_metrics(self) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """
+        Returns the node list + aligned metric vectors (for snapshotting).
+        """
+        return self.nodes, self.scores
+
+    def load_metrics(self, nodes: List[str], metrics: Dict[str, np.ndarray]):
+        """
+        Restores the cached scores from a snapshot produced by export_metrics().
+        """
+        self.nodes = list(nodes)
+        self.node_index = {n: i for i, n in enumerate(self.nodes)}
+        self.scores = {name: np.asarray(values, dtype=np.float64) for name, values in metrics.items()}
+
+    def _metric(self, name: str, idx: int) -> float:
+        values = self.scores.get(name)
+        return float(values[idx]) if values is not None else 0.0
+
     def get_risk_score(self, node: str) -> float:
         """
         Returns a normalized systemic risk score (0-100) using cached metrics.
         """
-        if node not in self.pagerank_scores:
+        idx = self.node_index.get(node)
+        if idx is None:
             return 0.0
 
         # Retrieve raw metrics
-        pr = self.pagerank_scores.get(node, 0)
-        deg = self.degree_scores.get(node, 0)
-        bet = self.betweenness_scores.get(node, 0)
+        pr = self._metric('pagerank', idx)
+        deg = self._metric('degree', idx)
+        bet = self._metric('betweenness', idx)
 
         # Weighted Formula (Heuristic)
         # PageRank is usually very small (e.g. 0.001), so we scale it heavily
         # These weights should be tuned in production
         raw_score = (pr * 50.0) + (deg * 30.0) + (bet * 20.0)
-        
+
         # Scale to 0-100 and clip
         # We use a logarithmic scaler or simple multiplier to make it readable
         final_score = min(raw_score * 100, 100.0)
-        
+
         return round(final_score, 2)
 
     def get_metrics(self, node: str) -> Dict[str, float]:
         """Returns raw metrics for explainability."""
-        return {
-            "pagerank": self.pagerank_scores.get(node, 0),
-            "degree": self.degree_scores.get(node, 0),
-            "betweenness": self.betweenness_scores.get(node, 0)
-        }
\ No newline at end of file
+        idx = self.node_index.get(node)
+        names = ["pagerank", "degree", "betweenness"] + (["eigenvector"] if "eigenvector" in self.scores else [])
+        if idx is None:
+            return {name: 0 for name in names}
+        return {name: self._metric(name, idx) for name in names}
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+from typing import Dict, List, Optional
+
+class CentralityCache:
+    """
+    Persists computed centrality vectors as a compact binary (NPZ) snapshot.
+    Snapshots are keyed on the network file hash plus the systemic config,
+    so a restart with unchanged inputs skips the heavy graph algorithms entirely.
+    """
+
+    # Bump whenever the snapshot layout or metric semantics change
+    SCHEMA_VERSION = 2
+
+    def __init__(self, cache_dir="data/cache", enabled=True):
+        self.logger = logging.getLogger("CentralityCache")
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+
+    def build_key(self, source_hash: str, config: Dict) -> str:
+        """
+        Hashes the network file digest (see GraphSnapshot.file_hash) together with
+        the config values that influence the metrics (damping factor, sampling, etc.).
+        """
+        digest = hashlib.sha256()
+        digest.update(f"schema={self.SCHEMA_VERSION}".encode())
+
+        # Only settings that change the numbers belong in the key
+        relevant = {k: v for k, v in (config or {}).items() if k != 'cache'}
+        digest.update(json.dumps(relevant, sort_keys=True, default=str).encode())
+        digest.update(source_hash.encode())
+        return digest.hexdigest()
+
+    def _snapshot_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"centrality_{key[:16]}.npz")
+
+    def load(self, key: str) -> Optional[Dict]:
+        """
+        Returns {'nodes': [...], 'metrics': {name: ndarray}} on a hit, None on a miss.
+        """
+        if not self.enabled:
+            return None
+
+        path = self._snapshot_path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with np.load(path, allow_pickle=False) as snapshot:
+                # Guard against prefix collisions and stale layouts
+                if str(snapshot['key']) != key:
+                    return None
+
+                nodes = snapshot['nodes'].tolist()
+                metrics = {
+                    name[len('metric_'):]: snapshot[name]
+                    for name in snapshot.files if name.startswith('metric_')
+                }
+        except Exception as e:
+            self.logger.warning(f"⚠️ Ignoring unreadable centrality snapshot {path}: {e}")
+            return None
+
+        self.logger.info(f"⚡ Loaded cached centrality metrics for {len(nodes)} nodes from {path}")
+        return {"nodes": nodes, "metrics": metrics}
+
+    def save(self, key: str, nodes: List[str], metrics: Dict[str, np.ndarray]):
+        """
+        Writes the snapshot atomically (temp file + rename) so a crash never
+        leaves a half-written file behind that would be picked up on restart.
+        """
+        if not self.enabled or not nodes:
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._snapshot_path(key)
+        tmp_path = path + ".tmp"
+
+        arrays = {f"metric_{name}": np.asarray(values, dtype=np.float64) for name, values in metrics.items()}
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, key=np.array(key), nodes=np.array(nodes, dtype=str), **arrays)
+            os.replace(tmp_path, path)
+            self.logger.info(f"💾 Centrality snapshot saved to {path}")
+        except Exception as e:
+            self.logger.error(f"❌ Failed to write centrality snapshot: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -1,9 +1,12 @@
+import json
 import logging
+import networkx as nx
+import numpy as np
 import pandas as pd
 import sys
 import os
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 # Ensure root path is accessible
 sys.path.append(os.getcwd())
@@ -12,27 +15,117 @@ from src.schemas.risk_objects import RiskSignal, RiskType
 from src.systemic_risk.graph_builder import GraphBuilder
 from src.systemic_risk.centrality import CentralityCalculator
 from src.systemic_risk.contagion import ContagionSimulator
+from src.systemic_risk.centrality_cache import CentralityCache
+from src.systemic_risk.graph_snapshot import GraphSnapshot
+from src.systemic_risk.sparse_graph import SparseGraph
+from src.systemic_risk.cascade import CascadeSimulator, Shock
+from src.systemic_risk.stress_testing import MonteCarloStressTester
+from src.systemic_risk.windowed_graph import WindowedGraph
+from src.systemic_risk.partitioning import GraphPartitioner
+from src.systemic_risk.exposure_index import ExposureIndex
+from src.monitoring.metrics import METRICS
+from src.monitoring.hot_path_log import HotPathLog
 
 class SystemicRiskEngine:
     """
     The Systemic Risk Controller.
-    1. Builds the graph from all transaction data.
-    2. Pre-computes centrality metrics (PageRank, etc.) for speed.
-    3. Runs contagion simulation on demand.
+    1. Builds the graph from all transaction data (or loads a binary graph snapshot).
+    2. Pre-computes centrality metrics (PageRank, etc.) for speed,
+       reusing a persisted snapshot when the network has not changed.
+    3. Pre-computes first-order contagion metrics for every node (bulk mode),
+       partition by partition on very large graphs.
     """
     
     def __init__(self):
         self.logger = logging.getLogger("SystemicEngine")
+        self.hot_log = HotPathLog(self.logger, "Systemic")
         self.builder = GraphBuilder()
         self.calculator = CentralityCalculator()
         self.simulator = ContagionSimulator()
+
+        cache_cfg = self.calculator.config.get('cache', {})
+        self.cache = CentralityCache(
+            cache_dir=cache_cfg.get('dir', 'data/cache'),
+            enabled=cache_cfg.get('enabled', True)
+        )
+        self.snapshots = GraphSnapshot()
+        self.snapshot_enabled = cache_cfg.get('enabled', True) and cache_cfg.get('graph_snapshot', True)
+        
+        cascade_cfg = self.calculator.config.get('cascade', {})
+        self.cascade = CascadeSimulator(
+            method=cascade_cfg.get('method', 'debtrank'),
+            buffer_ratio=cascade_cfg.get('buffer_ratio', 1.25),
+            tol=cascade_cfg.get('tol', 1e-8),
+            max_rounds=cascade_cfg.get('max_rounds', 100),
+            block_size=cascade_cfg.get('block_size', 64)
+        )
+        
+        self.partition_cfg = self.calculator.config.get('partition', {})
+        self.partitioner = GraphPartitioner(
+            max_iter=self.partition_cfg.get('max_iter', 20),
+            seed=self.partition_cfg.get('seed', 42),
+            max_task_nodes=self.partition_cfg.get('max_task_nodes', 200000)
+        )
+        self.partition_labels = None
+
+        exposure_cfg = self.calculator.config.get('exposure_index', {})
+        self.exposure_index = ExposureIndex(
+            max_hops=exposure_cfg.get('max_hops', 3),
+            top_n=exposure_cfg.get('top_n', 50),
+            direction=exposure_cfg.get('direction', 'out'),
+            block_rows=exposure_cfg.get('block_rows', 10000)
+        )
+        self.exposure_path = exposure_cfg.get('path', 'outputs/exposure_index.npz')
+        self.exposure_ready = False
+        self.deltas_applied = 0
         
-        self.graph = None
+        self._graph = None
+        self.sparse_graph = None
+        self.source_hash = ""
         self.is_initialized = False
 
+    @property
+    def graph(self) -> nx.DiGraph:
+        """NetworkX view of the network, materialized from the CSR arrays on first use."""
+        if self._graph is None and self.sparse_graph is not None:
+            self._graph = self.sparse_graph.to_networkx()
+        return self._graph
+
+    @graph.setter
+    def graph(self, value: Optional[nx.DiGraph]):
+        self._graph = value
+
+    def _graph_snapshot_path(self, source_hash: str) -> str:
+        return os.path.join(self.cache.cache_dir, f"graph_{source_hash[:16]}.npz")
+
+    def _build_sparse_graph(self, data_path: str, source_hash: str):
+        """Loads the cached graph snapshot for this network file, or parses the CSV and writes one."""
+        snapshot_path = self._graph_snapshot_path(source_hash)
+        if self.snapshot_enabled and os.path.exists(snapshot_path):
+            try:
+                self.sparse_graph, _ = self.snapshots.load(snapshot_path, expected_hash=source_hash)
+                self.graph = None
+                return
+            except Exception as e:
+                self.logger.warning(f"⚠️ Ignoring unusable graph snapshot {snapshot_path}: {e}")
+
+        # Load CSV and convert to list of dicts
+        df = pd.read_csv(data_path)
+        transactions = df.to_dict(orient='records')
+        
+        self.graph = self.builder.build_graph(transactions)
+        self.sparse_graph = SparseGraph.from_networkx(self.graph)
+
+        if self.snapshot_enabled and self.sparse_graph.number_of_nodes > 0:
+            try:
+                self.snapshots.save(snapshot_path, self.sparse_graph, source_hash)
+            except Exception as e:
+                self.logger.error(f"❌ Failed to write graph snapshot: {e}")
+
     def ingest_data(self, data_path="data/processed/network_mapped.csv"):
         """
         Loads network data and runs the heavy bulk calculations.
+        `data_path` is either the network CSV or a binary graph snapshot (.npz, see export_snapshot()).
         MUST be called before analyze().
         """
         self.logger.info("🕸️ Initializing Systemic Risk Engine...")
@@ -40,22 +133,253 @@ class SystemicRiskEngine:
         if not os.path.exists(data_path):
             self.logger.warning(f"⚠️ Network data not found at {data_path}. Engine will run in empty mode.")
             self.graph = self.builder.build_graph([])
+            self.sparse_graph = SparseGraph.from_networkx(self.graph)
+            self.simulator.compute_all_metrics(self.sparse_graph)
             self.is_initialized = True
             return
 
-        # Load CSV and convert to list of dicts
-        df = pd.read_csv(data_path)
-        transactions = df.to_dict(orient='records')
-        
-        # 1. Build Graph
-        self.graph = self.builder.build_graph(transactions)
+        # 1. Build Graph (the NetworkX view is only materialized if something asks for it)
+        with METRICS.timer("systemic.graph_load"):
+            if data_path.endswith('.npz'):
+                self.sparse_graph, header = self.snapshots.load(data_path)
+                self.graph = None
+                source_hash = header["source_sha256"]
+            else:
+                source_hash = GraphSnapshot.file_hash(data_path)
+                self._build_sparse_graph(data_path, source_hash)
+        self.source_hash = source_hash
         
         # 2. Pre-compute Centrality (The "Heavy Lift")
-        self.calculator.compute_all_metrics(self.graph)
+        # Skipped entirely when a snapshot for this exact network + config exists
+        cache_key = self.cache.build_key(source_hash, self.calculator.config)
+        snapshot = self.cache.load(cache_key)
+        if snapshot is not None and snapshot["nodes"] == self.sparse_graph.nodes:
+            self.calculator.load_metrics(snapshot["nodes"], snapshot["metrics"])
+        else:
+            with METRICS.timer("systemic.centrality", items=self.sparse_graph.number_of_nodes):
+                self.calculator.compute_all_metrics(self._graph, self.sparse_graph)
+            self.cache.save(cache_key, *self.calculator.export_metrics())
+
+        # 3. Pre-compute first-order contagion metrics for every node (bulk mode)
+        self.partition_labels = None
+        self.exposure_ready = False
+        self.deltas_applied = 0
+        with METRICS.timer("systemic.contagion", items=self.sparse_graph.number_of_nodes):
+            if (self.partition_cfg.get('enabled', False)
+                    and self.sparse_graph.number_of_nodes >= self.partition_cfg.get('min_nodes', 100000)):
+                tasks = self.partitioner.tasks(self.partition())
+                self.simulator.compute_partitioned(self.sparse_graph, tasks, workers=self.partition_cfg.get('workers'))
+            else:
+                self.simulator.compute_all_metrics(self.sparse_graph)
         
         self.is_initialized = True
         self.logger.info("✅ Systemic Engine Ready.")
 
+    def partition(self) -> np.ndarray:
+        """
+        Community label per node (aligned with sparse_graph.nodes). Computed once per
+        network file and persisted next to the other snapshots.
+        """
+        if self.partition_labels is not None:
+            return self.partition_labels
+
+        # A graph changed by apply_delta() no longer matches the file the cache is keyed on
+        pristine = self.deltas_applied == 0 and bool(self.source_hash)
+        path = os.path.join(self.cache.cache_dir, f"partition_{self.source_hash[:16]}.npz")
+        labels = self.partitioner.load(path, self.sparse_graph.nodes, self.source_hash) if pristine else None
+        if labels is None:
+            labels = self.partitioner.partition(self.sparse_graph)
+            if pristine and self.cache.enabled:
+                self.partitioner.save(path, self.sparse_graph.nodes, labels, self.source_hash)
+
+        self.partition_labels = labels
+        return labels
+
+    def community_summary(self, output_path: Optional[str] = None) -> List[Dict]:
+        """
+        Per-community systemic summary (size, internal / cross-community flow, score
+        distribution, leading entities). Written as JSON for the dashboard.
+        """
+        if not self.is_initialized:
+            raise RuntimeError("Systemic Engine not initialized. Call ingest_data() first.")
+
+        summary = self.partitioner.summarize(
+            self.sparse_graph, self.partition(), self.score_vector(),
+            limit=self.partition_cfg.get('summary_limit', 100)
+        )
+
+        output_path = output_path or self.partition_cfg.get('summary_path', 'outputs/community_summary.json')
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        with open(output_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+        self.logger.info(f"🧩 Community summary ({len(summary)} communities) saved to {output_path}")
+        return summary
+
+    def build_exposure_index(self) -> ExposureIndex:
+        """
+        Loads (or builds and saves) the k-hop exposure index for the current graph.
+        The saved file is also what the dashboard serves counterparty drill-downs from.
+        """
+        if not self.is_initialized:
+            raise RuntimeError("Systemic Engine not initialized. Call ingest_data() first.")
+        if self.exposure_ready:
+            return self.exposure_index
+
+        # A graph changed by apply_delta() no longer matches the file on disk
+        pristine = self.deltas_applied == 0 and bool(self.source_hash)
+        loaded = pristine and self.exposure_index.load(self.exposure_path, self.source_hash)
+        if not (loaded and self.exposure_index.nodes == self.sparse_graph.nodes):
+            self.exposure_index.build(self.sparse_graph)
+            if pristine:
+                self.exposure_index.save(self.exposure_path, self.source_hash)
+
+        self.exposure_ready = True
+        return self.exposure_index
+
+    def exposure(self, entity_id: str, max_hops: Optional[int] = None, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Counterparties within `max_hops` of `entity_id` with the aggregated flow connecting them,
+        served from the precomputed exposure index.
+        """
+        return self.build_exposure_index().query(entity_id, max_hops=max_hops, limit=limit)
+
+    def export_snapshot(self, path: str) -> Dict:
+        """
+        Writes the current graph as a binary snapshot that ingest_data() accepts in place
+        of the CSV. The header records the hash of the network file the graph was ingested from;
+        once apply_delta() has changed the graph it records a hash of the graph content instead
+        (plus the original file hash and the delta count), so reloading it never reuses the
+        centrality / partition / exposure caches of the original file.
+        """
+        if not self.is_initialized:
+            raise RuntimeError("Systemic Engine not initialized. Call ingest_data() first.")
+        if self.deltas_applied == 0:
+            return self.snapshots.save(path, self.sparse_graph, self.source_hash)
+        return self.snapshots.save(path, self.sparse_graph, GraphSnapshot.graph_hash(self.sparse_graph),
+                                   derived_from=self.source_hash, deltas_applied=self.deltas_applied)
+
+    def apply_delta(self, transactions: List[Dict]) -> Dict:
+        """
+        Merges new transactions (same format as the network CSV rows) into the live graph
+        without a full rebuild: PageRank is warm-started from the previous vector, degree and
+        contagion stats are refreshed only for the affected nodes.
+        Returns which entities' systemic scores moved by more than the configured tolerance.
+        """
+        if not self.is_initialized:
+            raise RuntimeError("Systemic Engine not initialized. Call ingest_data() first.")
+
+        tolerance = self.calculator.config.get('delta', {}).get('score_tolerance', 0.01)
+        previous_scores = self.score_vector()
+
+        # 1. Merge into both graph representations
+        applied = self.builder.merge_transactions(self.graph, transactions)
+        if not applied:
+            return {"transactions": 0, "new_nodes": 0, "edges_touched": 0, "changed_entities": []}
+        sparse_graph, info = self.sparse_graph.apply_delta(applied)
+        if self.calculator.config.get('delta', {}).get('verify', False):
+            # Debug check: the CSR update must equal the NetworkX graph the same delta was applied to
+            if not sparse_graph.matches(SparseGraph.from_networkx(self.graph)):
+                self.logger.error("❌ apply_delta: CSR graph diverged from the NetworkX graph.")
+
+        # 2. Affected nodes: edge endpoints, plus their predecessors (whose ego graphs contain them)
+        endpoints = np.unique(np.concatenate([info["rows"], info["cols"]]))
+        affected = np.union1d(endpoints, sparse_graph.predecessors(endpoints))
+
+        # 3. Incremental metric refresh
+        self.calculator.update_metrics(self.graph, sparse_graph, info)
+        self.simulator.update_metrics(sparse_graph, affected)
+        self.sparse_graph = sparse_graph
+        self.deltas_applied += 1
+        self.exposure_ready = False
+
+        # New entities start as singleton communities until the next full partition
+        if self.partition_labels is not None:
+            new_nodes = sparse_graph.number_of_nodes - len(self.partition_labels)
+            start = self.partition_labels.max(initial=-1) + 1
+            self.partition_labels = np.concatenate([self.partition_labels, start + np.arange(new_nodes)])
+
+        # 4. Report score changes (entities new to the graph previously scored 0)
+        current_scores = self.score_vector()
+        previous_scores = np.concatenate([previous_scores, np.zeros(len(current_scores) - len(previous_scores))])
+        moved = np.flatnonzero(np.abs(current_scores - previous_scores) >= tolerance)
+        moved = moved[np.argsort(-np.abs(current_scores[moved] - previous_scores[moved]))]
+
+        changed = [
+            {
+                "entity_id": sparse_graph.nodes[i],
+                "previous_score": round(float(previous_scores[i]), 2),
+                "current_score": round(float(current_scores[i]), 2),
+                "delta": round(float(current_scores[i] - previous_scores[i]), 2)
+            }
+            for i in moved
+        ]
+
+        self.logger.info(f"🔄 Applied {len(applied)} txns: {info['n_old']} -> {sparse_graph.number_of_nodes} nodes, "
+                         f"{len(affected)} affected, {len(changed)} systemic scores changed.")
+        return {
+            "transactions": len(applied),
+            "new_nodes": sparse_graph.number_of_nodes - info["n_old"],
+            "edges_touched": len(info["rows"]),
+            "changed_entities": changed
+        }
+
+    def score_vector(self) -> np.ndarray:
+        """
+        Blended systemic score for every node in the graph (aligned with sparse_graph.nodes),
+        using the same 60/40 centrality / contagion blend as analyze().
+        """
+        centrality = self.calculator.risk_score_vector()
+        contagion = np.round(self.simulator.contagion_scores, 2)
+        return np.minimum((centrality * 0.6) + (contagion * 0.4), 100.0)
+
+    def score_many(self, entity_ids: List[str]) -> np.ndarray:
+        """
+        analyze().normalized_score for many entities at once, gathered from one
+        score_vector() pass. Entities outside the graph score 0, as in analyze().
+        """
+        if not self.is_initialized:
+            raise RuntimeError("Systemic Engine not initialized. Call ingest_data() first.")
+
+        scores = self.score_vector()
+        rows = np.array([self.sparse_graph.node_index.get(str(e), -1) for e in entity_ids], dtype=np.int64)
+        found = rows >= 0
+        out = np.zeros(len(rows))
+        out[found] = scores[rows[found]]
+        return out
+
+    def top_k(self, k: int = 100) -> List[Dict]:
+        """
+        The k most systemically important entities, ranked on the blended score vector.
+        Selection is a partial sort (argpartition), so only the k winners are ordered and
+        only they get their metric breakdown assembled. Ties keep graph order.
+        """
+        if not self.is_initialized:
+            raise RuntimeError("Systemic Engine not initialized. Call ingest_data() first.")
+
+        scores = self.score_vector()
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((top, -scores[top]))]
+        centrality = self.calculator.risk_score_vector()
+
+        ranking = []
+        for rank, idx in enumerate(top, start=1):
+            entity_id = self.sparse_graph.nodes[idx]
+            contagion_data = self.simulator.lookup(entity_id)
+            ranking.append({
+                "rank": rank,
+                "entity_id": entity_id,
+                "systemic_score": round(float(scores[idx]), 2),
+                "centrality_score": float(centrality[idx]),
+                "contagion_score": contagion_data.get("contagion_score", 0.0),
+                "centrality_metrics": self.calculator.get_metrics(entity_id),
+                "stress_test_results": contagion_data
+            })
+        return ranking
+
     def analyze(self, entity_id: str) -> RiskSignal:
         """
         Returns the Systemic Risk Profile for a specific entity.
@@ -68,30 +392,89 @@ class SystemicRiskEngine:
         centrality_metrics = self.calculator.get_metrics(entity_id)
         
         # 2. Get Dynamic Risk (Contagion Simulation)
-        contagion_data = self.simulator.simulate_failure(self.graph, entity_id)
+        contagion_data = self.simulator.lookup(entity_id)
         contagion_score = contagion_data.get("contagion_score", 0.0)
 
         # 3. Blended Score (60% Centrality, 40% Contagion Potential)
         final_score = (centrality_score * 0.6) + (contagion_score * 0.4)
         final_score = min(final_score, 100.0)
 
-        # 4. Construct Metadata
+        # 4. Build Signal
+        signal = self.build_signal(entity_id, final_score, centrality_metrics, contagion_data)
+        
+        self.hot_log.record(final_score, "🕸️ Systemic Score for %s: %.2f", entity_id, final_score)
+        return signal
+
+    def build_signal(self, entity_id: str, final_score: float,
+                     centrality_metrics: Optional[Dict] = None, contagion_data: Optional[Dict] = None) -> RiskSignal:
+        """
+        Wraps an already computed systemic score (e.g. from score_many()) into the
+        standard RiskSignal; the metadata is looked up when not passed in.
+        """
+        # Construct Metadata
         metadata = {
-            "centrality_metrics": centrality_metrics,
-            "stress_test_results": contagion_data,
-            "network_nodes": self.graph.number_of_nodes()
+            "centrality_metrics": centrality_metrics if centrality_metrics is not None else self.calculator.get_metrics(entity_id),
+            "stress_test_results": contagion_data if contagion_data is not None else self.simulator.lookup(entity_id),
+            "network_nodes": self.sparse_graph.number_of_nodes
         }
 
-        # 5. Build Signal
-        signal = RiskSignal(
+        return RiskSignal(
             entity_id=entity_id,
             risk_type=RiskType.SYSTEMIC,
-            raw_score=final_score,         # Raw and Normalized are similar here
-            normalized_score=final_score,
+            raw_score=float(final_score),         # Raw and Normalized are similar here
+            normalized_score=float(final_score),
             confidence=0.85,               # Graph algorithms are deterministic
             timestamp=datetime.now(),
             metadata=metadata
         )
-        
-        self.logger.info(f"🕸️ Systemic Score for {entity_id}: {final_score:.2f}")
-        return signal
\ No newline at end of file
+
+    def simulate_cascade(self, shocks: List[Shock]) -> List[dict]:
+        """
+        Multi-round default cascade (DebtRank / Eisenberg-Noe) for each shock.
+        A shock is a list of defaulting entity IDs or {entity_id: initial distress}.
+        """
+        if not self.is_initialized:
+            raise RuntimeError("Systemic Engine not initialized. Call ingest_data() first.")
+
+        # Operators are built lazily, once per ingested graph
+        if self.cascade.graph is not self.sparse_graph:
+            self.cascade.fit(self.sparse_graph)
+        return self.cascade.simulate(shocks)
+
+    def run_stress_test(self, **overrides) -> Dict:
+        """
+        Monte Carlo stress test: samples shock scenarios (see systemic_risk.stress_test
+        in the config; keyword arguments override it), runs each cascade in a process
+        pool and returns per-node and system-wide loss distributions (mean, VaR, ES).
+        """
+        if not self.is_initialized:
+            raise RuntimeError("Systemic Engine not initialized. Call ingest_data() first.")
+
+        params = {**self.calculator.config.get('stress_test', {}), **overrides}
+        cascade_params = {
+            "method": self.cascade.method,
+            "buffer_ratio": self.cascade.buffer_ratio,
+            "tol": self.cascade.tol,
+            "max_rounds": self.cascade.max_rounds,
+            "block_size": self.cascade.block_size
+        }
+        tester = MonteCarloStressTester(cascade_params=cascade_params, **params)
+        return tester.run(self.sparse_graph)
+
+    def centrality_trend(self, data_path="data/processed/network_steps_mapped.csv",
+                         window: Optional[int] = None, stride: Optional[int] = None,
+                         entities: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Rolling-window PageRank trend (rows = window end step, columns = entities), from the
+        per-step flows written by unify_data (network_mapped.csv has no time column).
+        Window size / stride default to systemic_risk.window in the config.
+        """
+        window_cfg = self.calculator.config.get('window', {})
+        windowed = WindowedGraph(time_col=window_cfg.get('time_col', 'step')).load(pd.read_csv(data_path))
+        return windowed.centrality_trend(
+            window=window or window_cfg.get('size', 7),
+            stride=stride or window_cfg.get('stride', 1),
+            alpha=self.calculator.config.get('damping_factor', 0.85),
+            entities=entities,
+            solver=self.calculator.solver
+        )
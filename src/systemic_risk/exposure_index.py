@@ -0,0 +1,208 @@
+import json
+import logging
+import os
+import numpy as np
+import scipy.sparse as sp
+from typing import Dict, List, Optional
+
+from src.systemic_risk.sparse_graph import SparseGraph
+
+def _top_n_per_row(rows: np.ndarray, weights: np.ndarray, top_n: int) -> np.ndarray:
+    """
+    Positions of the `top_n` heaviest entries of every row, ordered by row and then
+    by descending weight. `rows` must be sorted ascending.
+    """
+    order = np.lexsort((-weights, rows))
+    counts = np.bincount(rows)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(len(order)) - starts[rows[order]]
+    return order[rank < top_n]
+
+class ExposureIndex:
+    """
+    Precomputed, bounded k-hop counterparty neighbourhoods served from flat arrays.
+
+    Hop 1 weights are the direct flows. Each further hop passes the flow reached so
+    far on in proportion to every intermediary's outgoing shares (W_k = W_(k-1) P), so
+    W_k[x, y] is the part of x's flow expected to reach y through paths of exactly k hops.
+    After every hop each row keeps only its `top_n` heaviest frontier entries (pruned BFS),
+    which bounds time and memory. Per counterparty the weights are summed over hops and
+    the shortest hop distance is kept.
+
+    direction='out' indexes who is exposed to an entity (where its money goes);
+    direction='in' indexes who the entity depends on (where its money comes from).
+    """
+
+    # Bump whenever the array layout or the weighting changes
+    SCHEMA_VERSION = 1
+
+    def __init__(self, max_hops: int = 3, top_n: int = 50, direction: str = "out", block_rows: int = 10000):
+        if direction not in ("out", "in"):
+            raise ValueError(f"Unknown exposure direction: {direction}")
+
+        self.logger = logging.getLogger("ExposureIndex")
+        self.max_hops = max_hops
+        self.top_n = top_n
+        self.direction = direction
+        self.block_rows = block_rows
+
+        # CSR-like layout: row i's counterparties are neighbors[indptr[i]:indptr[i + 1]]
+        self.nodes = []
+        self.node_index = {}
+        self.indptr = None
+        self.neighbors = None
+        self.weights = None
+        self.hops = None
+
+    @property
+    def params(self) -> Dict:
+        return {"max_hops": self.max_hops, "top_n": self.top_n, "direction": self.direction}
+
+    @property
+    def is_built(self) -> bool:
+        return self.indptr is not None
+
+    def _prune(self, frontier: sp.csr_array) -> sp.csr_array:
+        counts = np.diff(frontier.indptr)
+        if counts.max(initial=0) <= self.top_n:
+            return frontier
+        rows = np.repeat(np.arange(frontier.shape[0]), counts)
+        keep = _top_n_per_row(rows, frontier.data, self.top_n)
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(rows[keep], minlength=frontier.shape[0]))])
+        return sp.csr_array((frontier.data[keep], frontier.indices[keep], indptr), shape=frontier.shape)
+
+    def build(self, sparse_graph: SparseGraph) -> "ExposureIndex":
+        n = sparse_graph.number_of_nodes
+        adjacency = sparse_graph.adjacency if self.direction == "out" else sp.csr_array(sparse_graph.adjacency.T)
+        self.logger.info(f"🔗 Building {self.max_hops}-hop exposure index (top {self.top_n}) for {n} nodes...")
+
+        # Row-stochastic pass-through shares
+        outflow = np.asarray(adjacency.sum(axis=1)).ravel()
+        inv_out = np.zeros_like(outflow)
+        np.divide(1.0, outflow, out=inv_out, where=outflow > 0)
+        shares = sp.csr_array(adjacency, copy=True)
+        shares.data *= np.repeat(inv_out, np.diff(shares.indptr))
+
+        counts = np.zeros(n, dtype=np.int64)
+        neighbors, weights, hops = [], [], []
+        for start in range(0, n, self.block_rows):
+            stop = min(start + self.block_rows, n)
+            frontier = sp.csr_array(adjacency[np.arange(start, stop)])
+
+            parts = []
+            for hop in range(1, self.max_hops + 1):
+                frontier = self._prune(frontier)
+                coo = frontier.tocoo()
+                parts.append((coo.row.astype(np.int64), coo.col.astype(np.int64), coo.data,
+                              np.full(coo.nnz, hop, dtype=np.int8)))
+                if hop < self.max_hops:
+                    frontier = sp.csr_array(frontier @ shares)
+
+            rows, cols, data, hop_of = (np.concatenate(arrays) for arrays in zip(*parts))
+
+            # Aggregate each (source, counterparty) pair over hops, dropping paths back to the source
+            keys, inverse = np.unique(rows * n + cols, return_inverse=True)
+            total = np.bincount(inverse, weights=data)
+            shortest = np.full(len(keys), np.iinfo(np.int8).max, dtype=np.int8)
+            np.minimum.at(shortest, inverse, hop_of)
+            rows, cols = keys // n, keys % n
+            valid = (cols != rows + start) & (total > 0)
+            rows, cols, total, shortest = rows[valid], cols[valid], total[valid], shortest[valid]
+
+            keep = _top_n_per_row(rows, total, self.top_n)
+            counts[start:stop] = np.bincount(rows[keep], minlength=stop - start)
+            neighbors.append(cols[keep].astype(np.int32))
+            weights.append(total[keep])
+            hops.append(shortest[keep])
+
+        self.nodes = list(sparse_graph.nodes)
+        self.node_index = sparse_graph.node_index
+        self.indptr = np.concatenate([[0], np.cumsum(counts)])
+        self.neighbors = np.concatenate(neighbors) if neighbors else np.zeros(0, dtype=np.int32)
+        self.weights = np.concatenate(weights) if weights else np.zeros(0)
+        self.hops = np.concatenate(hops) if hops else np.zeros(0, dtype=np.int8)
+
+        self.logger.info(f"✅ Exposure index built: {len(self.neighbors)} entries.")
+        return self
+
+    def query(self, entity_id: str, max_hops: Optional[int] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Counterparties of `entity_id` within `max_hops`, heaviest aggregated flow first."""
+        if not self.is_built:
+            raise RuntimeError("Exposure index not built. Call build() or load() first.")
+
+        idx = self.node_index.get(entity_id)
+        if idx is None:
+            return []
+
+        lo, hi = self.indptr[idx], self.indptr[idx + 1]
+        neighbors, weights, hops = self.neighbors[lo:hi], self.weights[lo:hi], self.hops[lo:hi]
+        if max_hops is not None and max_hops < self.max_hops:
+            mask = hops <= max_hops
+            neighbors, weights, hops = neighbors[mask], weights[mask], hops[mask]
+        if limit is not None:
+            neighbors, weights, hops = neighbors[:limit], weights[:limit], hops[:limit]
+
+        return [
+            {"entity_id": self.nodes[j], "hops": int(h), "exposure": round(float(w), 2)}
+            for j, w, h in zip(neighbors, weights, hops)
+        ]
+
+    def save(self, path: str, source_hash: str):
+        """Persists the index (atomic temp file + rename)."""
+        header = {"schema_version": self.SCHEMA_VERSION, "source_sha256": source_hash, "params": self.params}
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(
+                    f,
+                    header=np.array(json.dumps(header)),
+                    nodes=np.array(self.nodes, dtype=str),
+                    indptr=self.indptr,
+                    neighbors=self.neighbors,
+                    weights=self.weights,
+                    hops=self.hops
+                )
+            os.replace(tmp_path, path)
+            self.logger.info(f"💾 Exposure index saved to {path}")
+        except Exception as e:
+            self.logger.error(f"❌ Failed to write exposure index: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def load(self, path: str, source_hash: Optional[str] = None) -> bool:
+        """
+        Loads a saved index if it matches this instance's parameters (and, when given,
+        the network file hash). Returns False on a miss.
+        """
+        if not os.path.exists(path):
+            return False
+
+        try:
+            with np.load(path, allow_pickle=False) as snapshot:
+                header = json.loads(str(snapshot['header']))
+                if (header.get("schema_version") != self.SCHEMA_VERSION
+                        or header.get("params") != self.params
+                        or (source_hash is not None and header.get("source_sha256") != source_hash)):
+                    return False
+
+                self.nodes = snapshot['nodes'].tolist()
+                self.indptr = snapshot['indptr']
+                self.neighbors = snapshot['neighbors']
+                self.weights = snapshot['weights']
+                self.hops = snapshot['hops']
+        except Exception as e:
+            self.logger.warning(f"⚠️ Ignoring unreadable exposure index {path}: {e}")
+            return False
+
+        self.node_index = {node: i for i, node in enumerate(self.nodes)}
+        self.logger.info(f"⚡ Loaded exposure index ({len(self.neighbors)} entries) from {path}")
+        return True
+
+    @classmethod
+    def from_file(cls, path: str) -> Optional["ExposureIndex"]:
+        """Opens a saved index with the parameters recorded in its header (read-only serving)."""
+        with np.load(path, allow_pickle=False) as snapshot:
+            params = json.loads(str(snapshot['header'])).get("params", {})
+        index = cls(**params)
+        return index if index.load(path) else None
@@ -1,6 +1,6 @@
 import networkx as nx
 import logging
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
 class GraphBuilder:
     """
@@ -39,4 +39,35 @@ class GraphBuilder:
             count += 1
                 
         self.logger.info(f"✅ Graph built: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges from {count} txns.")
-        return G
\ No newline at end of file
+        return G
+
+    def merge_transactions(self, G: nx.DiGraph, transactions: List[Dict]) -> List[Tuple[str, str, float]]:
+        """
+        Delta path (SystemicRiskEngine.apply_delta): adds transactions to an existing graph in
+        place (summing onto existing edges), one at a time. Unlike build_graph(), which keeps
+        every edge it sees, negative amounts reduce a flow, edges whose aggregated weight drops
+        to zero or below are removed, and only a positive amount creates a missing edge
+        (SparseGraph.apply_delta uses the same rule).
+        Returns the (source, target, amount) triples that were applied.
+        """
+        applied = []
+        for txn in transactions:
+            src = txn.get('source')
+            dst = txn.get('target')
+            amount = float(txn.get('amount', 1.0))
+
+            if not src or not dst:
+                continue
+
+            # Add edge with weight aggregation (summing multiple transactions)
+            if G.has_edge(src, dst):
+                G[src][dst]['weight'] += amount
+                if G[src][dst]['weight'] <= 0:
+                    G.remove_edge(src, dst)
+            elif amount > 0:
+                G.add_edge(src, dst, weight=amount)
+            else:
+                continue
+            applied.append((src, dst, amount))
+
+        return applied
\ No newline at end of file
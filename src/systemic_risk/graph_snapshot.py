@@ -0,0 +1,104 @@
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+import scipy.sparse as sp
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from src.systemic_risk.sparse_graph import SparseGraph
+
+class GraphSnapshot:
+    """
+    Binary (NPZ) snapshot of the systemic graph: the interned node table plus the
+    CSR arrays (indptr / indices / weights) and a JSON header recording the schema
+    version and the SHA-256 of the network file it was built from.
+    Loading one skips CSV parsing and NetworkX construction entirely.
+    """
+
+    # Bump whenever the array layout changes
+    SCHEMA_VERSION = 1
+
+    def __init__(self):
+        self.logger = logging.getLogger("GraphSnapshot")
+
+    @staticmethod
+    def file_hash(path: str) -> str:
+        """SHA-256 of a file's raw bytes, read in 1 MB blocks."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def graph_hash(sparse_graph: SparseGraph) -> str:
+        """SHA-256 of the graph content itself (node table + CSR arrays), for graphs with no source file."""
+        adjacency = sparse_graph.adjacency
+        digest = hashlib.sha256()
+        digest.update("\x00".join(sparse_graph.nodes).encode("utf-8"))
+        for array in (adjacency.indptr.astype(np.int64), adjacency.indices.astype(np.int64),
+                      adjacency.data.astype(np.float64)):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    def save(self, path: str, sparse_graph: SparseGraph, source_hash: str, **extra) -> Dict:
+        """
+        Writes the snapshot atomically (temp file + rename). Arrays are stored
+        uncompressed so loading is a straight binary read. `extra` goes into the header.
+        """
+        header = {
+            "schema_version": self.SCHEMA_VERSION,
+            "source_sha256": source_hash,
+            "nodes": sparse_graph.number_of_nodes,
+            "edges": sparse_graph.number_of_edges,
+            "created_at": datetime.now().isoformat(),
+            **extra
+        }
+        adjacency = sparse_graph.adjacency
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(
+                    f,
+                    header=np.array(json.dumps(header)),
+                    nodes=np.array(sparse_graph.nodes, dtype=str),
+                    indptr=adjacency.indptr,
+                    indices=adjacency.indices,
+                    data=adjacency.data
+                )
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.logger.info(f"💾 Graph snapshot saved to {path} ({header['nodes']} nodes, {header['edges']} edges)")
+        return header
+
+    def read_header(self, path: str) -> Dict:
+        with np.load(path, allow_pickle=False) as snapshot:
+            return json.loads(str(snapshot['header']))
+
+    def load(self, path: str, expected_hash: Optional[str] = None) -> Tuple[SparseGraph, Dict]:
+        """
+        Returns (SparseGraph, header). Raises ValueError when the snapshot was written
+        with another schema version or (if `expected_hash` is given) from another source file.
+        """
+        with np.load(path, allow_pickle=False) as snapshot:
+            header = json.loads(str(snapshot['header']))
+            if header.get("schema_version") != self.SCHEMA_VERSION:
+                raise ValueError(f"Graph snapshot {path} has schema v{header.get('schema_version')}, "
+                                 f"expected v{self.SCHEMA_VERSION}")
+            if expected_hash is not None and header.get("source_sha256") != expected_hash:
+                raise ValueError(f"Graph snapshot {path} was built from a different network file")
+
+            nodes = snapshot['nodes'].tolist()
+            n = len(nodes)
+            adjacency = sp.csr_array((snapshot['data'], snapshot['indices'], snapshot['indptr']), shape=(n, n))
+
+        self.logger.info(f"⚡ Loaded graph snapshot from {path} ({n} nodes, {adjacency.nnz} edges)")
+        return SparseGraph(nodes, adjacency), header
@@ -0,0 +1,96 @@
+import logging
+import numpy as np
+import scipy.sparse as sp
+from typing import Optional
+
+class SparseCentralityEngine:
+    """
+    Vectorized power-iteration solvers (PageRank, Eigenvector) over a CSR adjacency.
+    Each iteration is a single sparse mat-vec product, so large graphs converge in
+    seconds. Supports warm starts and records the iteration count of every run.
+    """
+
+    def __init__(self, tol: float = 1e-6, max_iter: int = 100):
+        self.logger = logging.getLogger("SparseCentrality")
+        self.tol = tol
+        self.max_iter = max_iter
+
+        # Iterations used by the last run of each algorithm (for reporting)
+        self.iterations = {}
+
+    @staticmethod
+    def _as_distribution(vec: Optional[np.ndarray], n: int) -> np.ndarray:
+        """Normalizes an optional non-negative vector to sum 1 (uniform if missing/empty)."""
+        if vec is None:
+            return np.full(n, 1.0 / n)
+        vec = np.asarray(vec, dtype=np.float64)
+        total = vec.sum()
+        if total <= 0:
+            return np.full(n, 1.0 / n)
+        return vec / total
+
+    def pagerank(self, adjacency: sp.csr_array, alpha: float = 0.85,
+                 personalization: Optional[np.ndarray] = None,
+                 dangling: Optional[np.ndarray] = None,
+                 x0: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Weighted PageRank. Mass sitting on dangling nodes (no outgoing flow) is
+        redistributed according to `dangling` (defaults to the personalization vector).
+        `x0` warm-starts the iteration, e.g. with the previous PageRank vector.
+        """
+        n = adjacency.shape[0]
+        if n == 0:
+            return np.zeros(0)
+
+        # Row-stochastic transition matrix: P = D_out^-1 * W
+        out_strength = np.asarray(adjacency.sum(axis=1)).ravel()
+        is_dangling = out_strength == 0
+        inv_strength = np.zeros(n)
+        inv_strength[~is_dangling] = 1.0 / out_strength[~is_dangling]
+        transition = sp.csr_array(adjacency, copy=True)
+        transition.data *= np.repeat(inv_strength, np.diff(transition.indptr))
+        # x @ P == P^T @ x; keep the transpose in CSR for fast mat-vecs
+        transition_t = sp.csr_array(transition.T)
+
+        p = self._as_distribution(personalization, n)
+        d = p if dangling is None else self._as_distribution(dangling, n)
+        x = self._as_distribution(x0, n)
+
+        for i in range(1, self.max_iter + 1):
+            x_last = x
+            x = alpha * (transition_t @ x_last + x_last[is_dangling].sum() * d) + (1 - alpha) * p
+            if np.abs(x - x_last).sum() < n * self.tol:
+                self.iterations['pagerank'] = i
+                return x
+
+        self.iterations['pagerank'] = self.max_iter
+        self.logger.warning(f"⚠️ PageRank did not converge within {self.max_iter} iterations.")
+        return x
+
+    def eigenvector(self, adjacency: sp.csr_array, x0: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Weighted (in-edge) eigenvector centrality, L2-normalized.
+        Iterates on (A + I) like NetworkX to avoid oscillation on periodic graphs.
+        """
+        n = adjacency.shape[0]
+        if n == 0:
+            return np.zeros(0)
+
+        adjacency_t = sp.csr_array(adjacency.T)
+        x = self._as_distribution(x0, n)
+
+        for i in range(1, self.max_iter + 1):
+            x_last = x
+            x = x_last + adjacency_t @ x_last
+            norm = np.linalg.norm(x)
+            if norm == 0:
+                self.iterations['eigenvector'] = i
+                return x
+            x = x / norm
+            if np.abs(x - x_last).sum() < n * self.tol:
+                self.iterations['eigenvector'] = i
+                return x
+
+        self.iterations['eigenvector'] = self.max_iter
+        self.logger.warning(f"⚠️ Eigenvector centrality did not converge within {self.max_iter} iterations.")
+        return x
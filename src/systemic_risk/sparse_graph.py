@@ -0,0 +1,143 @@
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+from typing import Dict, List, Optional, Tuple
+
+class SparseGraph:
+    """
+    Compressed Sparse Row (CSR) view of the weighted transaction graph.
+    Row i holds the outgoing flows of nodes[i]; values are the aggregated amounts.
+    Shared by the vectorized centrality / contagion code so the conversion from
+    NetworkX happens once per graph instead of once per algorithm.
+    """
+
+    def __init__(self, nodes: List[str], adjacency: sp.csr_array):
+        self.nodes = list(nodes)
+        self.node_index = {n: i for i, n in enumerate(self.nodes)}
+        self.adjacency = sp.csr_array(adjacency, dtype=np.float64)
+
+    @classmethod
+    def from_networkx(cls, graph: nx.DiGraph, weight: str = 'weight') -> "SparseGraph":
+        nodes = list(graph.nodes())
+        if not nodes:
+            return cls([], sp.csr_array((0, 0), dtype=np.float64))
+
+        adjacency = nx.to_scipy_sparse_array(graph, nodelist=nodes, weight=weight, dtype=np.float64, format='csr')
+        return cls(nodes, adjacency)
+
+    def to_networkx(self, weight: str = 'weight') -> nx.DiGraph:
+        """Rebuilds the NetworkX graph (same node order) for code paths that still need it."""
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.nodes)
+        coo = self.adjacency.tocoo()
+        names = np.array(self.nodes, dtype=object)
+        graph.add_weighted_edges_from(zip(names[coo.row], names[coo.col], coo.data.tolist()), weight=weight)
+        return graph
+
+    @property
+    def number_of_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def number_of_edges(self) -> int:
+        return int(self.adjacency.nnz)
+
+    def index_of(self, node: str) -> Optional[int]:
+        return self.node_index.get(node)
+
+    def out_strength(self) -> np.ndarray:
+        """Total outgoing flow per node."""
+        return np.asarray(self.adjacency.sum(axis=1)).ravel()
+
+    def in_strength(self) -> np.ndarray:
+        """Total incoming flow per node."""
+        return np.asarray(self.adjacency.sum(axis=0)).ravel()
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.adjacency.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        return np.bincount(self.adjacency.indices, minlength=self.number_of_nodes)
+
+    def predecessors(self, targets: np.ndarray) -> np.ndarray:
+        """Indices of all nodes with an edge into any of `targets`."""
+        hits = np.isin(self.adjacency.indices, targets)
+        rows = np.repeat(np.arange(self.number_of_nodes), np.diff(self.adjacency.indptr))
+        return np.unique(rows[hits])
+
+    def apply_delta(self, triples: List[Tuple[str, str, float]]) -> Tuple["SparseGraph", Dict]:
+        """
+        Returns a new SparseGraph with the (source, target, amount) flows merged in.
+        Unknown entities are appended to the node table, so existing indices stay valid.
+        Flows are replayed one at a time with the same rule as GraphBuilder.merge_transactions:
+        an existing edge (whatever its stored weight) takes the amount and is removed once its
+        weight drops to zero or below; a missing edge is only created by a positive amount.
+        The info dict describes the touched edges for incremental metric updates.
+        """
+        nodes = list(self.nodes)
+        index = dict(self.node_index)
+        src_idx, dst_idx, amounts = [], [], []
+        for src, dst, amount in triples:
+            for node in (src, dst):
+                if node not in index:
+                    index[node] = len(nodes)
+                    nodes.append(node)
+            src_idx.append(index[src])
+            dst_idx.append(index[dst])
+            amounts.append(amount)
+
+        n_old, n = self.number_of_nodes, len(nodes)
+        old = self.adjacency
+        # Growing the node table only appends empty rows / columns
+        indptr = np.concatenate([old.indptr, np.full(n - n_old, old.indptr[-1], dtype=old.indptr.dtype)])
+        resized = sp.csr_array((old.data, old.indices, indptr), shape=(n, n))
+
+        # Touched cells in first-seen order, with their current weights
+        touched = {}
+        for key in zip(src_idx, dst_idx):
+            touched.setdefault(key, len(touched))
+        rows = np.fromiter((r for r, _ in touched), dtype=np.int64, count=len(touched))
+        cols = np.fromiter((c for _, c in touched), dtype=np.int64, count=len(touched))
+        old_weights = np.asarray(resized[rows, cols]).ravel() if len(touched) else np.zeros(0)
+
+        # Presence is structural: the full build can store zero / negative weights
+        coo = resized.tocoo()
+        old_keys = coo.row.astype(np.int64) * n + coo.col
+        touched_keys = rows * n + cols
+        existed = np.isin(touched_keys, old_keys)
+
+        weights, alive = old_weights.copy(), existed.copy()
+        for key, amount in zip(zip(src_idx, dst_idx), amounts):
+            i = touched[key]
+            if alive[i]:
+                weights[i] += amount
+                if weights[i] <= 0:
+                    alive[i], weights[i] = False, 0.0
+            elif amount > 0:
+                alive[i], weights[i] = True, amount
+
+        # Drop the touched cells from the old arrays, then add back the surviving ones
+        keep = ~np.isin(old_keys, touched_keys)
+        updated = sp.csr_array(sp.coo_array(
+            (np.concatenate([coo.data[keep], weights[alive]]),
+             (np.concatenate([coo.row[keep], rows[alive]]), np.concatenate([coo.col[keep], cols[alive]]))),
+            shape=(n, n)
+        ))
+
+        info = {
+            "rows": rows,
+            "cols": cols,
+            "existed": existed,
+            "exists": alive,
+            "n_old": n_old
+        }
+        return SparseGraph(nodes, updated), info
+
+    def matches(self, other: "SparseGraph", rtol: float = 1e-9) -> bool:
+        """Same node set and the same weighted edges (node order may differ)."""
+        if set(self.nodes) != set(other.nodes) or self.number_of_edges != other.number_of_edges:
+            return False
+        order = np.array([other.node_index[node] for node in self.nodes])
+        aligned = other.adjacency[order][:, order]
+        diff = abs(sp.csr_array(self.adjacency - aligned))
+        return diff.nnz == 0 or bool(diff.max() <= rtol * max(abs(self.adjacency).max(), 1.0))
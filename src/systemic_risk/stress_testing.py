@@ -0,0 +1,205 @@
+import logging
+import math
+import os
+import numpy as np
+import scipy.sparse as sp
+from concurrent.futures import ProcessPoolExecutor
+from scipy.special import ndtri
+from typing import Dict, List, Optional
+
+from src.systemic_risk.cascade import CascadeSimulator
+from src.systemic_risk.sparse_graph import SparseGraph
+
+# Per-process simulator, installed once by the pool initializer
+_WORKER_STATE = {}
+
+def _init_worker(nodes: List[str], adjacency: sp.csr_array, cascade_params: Dict, scenario_params: Dict):
+    graph = SparseGraph(nodes, adjacency)
+    _WORKER_STATE['simulator'] = CascadeSimulator(**cascade_params).fit(graph)
+    _WORKER_STATE['params'] = scenario_params
+
+def _run_chunk(task):
+    """
+    Runs `count` scenarios from an independent seed and reduces them in the worker;
+    returns TailAccumulator.partial(), never the dense (n_nodes x count) loss block.
+    """
+    seed, count, tail_size = task
+    simulator = _WORKER_STATE['simulator']
+    params = _WORKER_STATE['params']
+    rng = np.random.default_rng(seed)
+
+    accumulator = TailAccumulator(simulator.graph.number_of_nodes, tail_size)
+    for start in range(0, count, simulator.block_size):
+        size = min(simulator.block_size, count - start)
+        h0 = ScenarioSampler.sample(rng, simulator, size, **params)
+        losses, _ = simulator.propagate(h0)
+        accumulator.update(losses)
+    return accumulator.partial()
+
+class ScenarioSampler:
+    """
+    Draws the initial distress block (n_nodes x n_scenarios) for a batch of scenarios.
+      - 'random':     each node defaults independently with probability `default_prob`
+      - 'correlated': one-factor Gaussian copula; node i defaults when
+                      sqrt(rho) * M + sqrt(1 - rho) * e_i < Phi^-1(default_prob)
+      - 'haircut':    every exposure takes a Beta-distributed haircut; a creditor's initial
+                      distress is the haircut-weighted share of its equity that is lost
+    """
+
+    @staticmethod
+    def sample(rng: np.random.Generator, simulator: CascadeSimulator, size: int,
+               kind: str = "correlated", default_prob: float = 0.01, rho: float = 0.3,
+               haircut_alpha: float = 1.0, haircut_beta: float = 9.0) -> np.ndarray:
+        n = simulator.graph.number_of_nodes
+
+        if kind == "random":
+            return (rng.random((n, size)) < default_prob).astype(np.float64)
+
+        if kind == "correlated":
+            threshold = ndtri(default_prob)
+            market = rng.standard_normal(size)
+            idiosyncratic = rng.standard_normal((n, size))
+            latent = math.sqrt(rho) * market[None, :] + math.sqrt(1.0 - rho) * idiosyncratic
+            return (latent < threshold).astype(np.float64)
+
+        if kind == "haircut":
+            # impact[i, j] = exposure of i to j / equity_i, so the row sum of the
+            # haircut-scaled impact matrix is the fraction of equity i loses up front
+            impact = simulator.impact
+            h0 = np.empty((n, size))
+            for col in range(size):
+                haircuts = rng.beta(haircut_alpha, haircut_beta, size=impact.nnz)
+                scaled = sp.csr_array((impact.data * haircuts, impact.indices, impact.indptr), shape=impact.shape)
+                h0[:, col] = np.asarray(scaled.sum(axis=1)).ravel()
+            return np.minimum(h0, 1.0)
+
+        raise ValueError(f"Unknown scenario kind: {kind}")
+
+class TailAccumulator:
+    """
+    Streaming VaR / Expected Shortfall. Only the worst ceil((1 - q) * N) losses per node
+    can influence VaR_q and ES_q, so each node keeps a bounded tail buffer that is merged
+    chunk by chunk with np.partition; memory stays O(n_nodes x tail) regardless of N.
+    Workers reduce their own chunk into a partial() that the parent merge()s, so only
+    bounded tails, per-node sums and per-scenario system losses cross the process pipe.
+    """
+
+    def __init__(self, n_nodes: int, tail_size: int):
+        self.tail_size = max(1, tail_size)
+        self.tail = np.empty((n_nodes, 0))
+        self.system_tail = np.empty(0)
+        self.system_losses = []
+        self.total = np.zeros(n_nodes)
+        self.count = 0
+
+    def _merge(self, current: np.ndarray, incoming: np.ndarray) -> np.ndarray:
+        merged = np.concatenate([current, incoming], axis=-1)
+        if merged.shape[-1] <= self.tail_size:
+            return merged
+        cut = merged.shape[-1] - self.tail_size
+        return np.partition(merged, cut, axis=-1)[..., cut:]
+
+    def update(self, losses: np.ndarray):
+        """losses: (n_nodes x n_scenarios) block."""
+        system = losses.sum(axis=0)
+        self.tail = self._merge(self.tail, losses)
+        self.system_tail = self._merge(self.system_tail, system)
+        self.system_losses.append(system)
+        self.total += losses.sum(axis=1)
+        self.count += losses.shape[1]
+
+    def partial(self) -> Dict:
+        """Reduced state of the scenarios seen so far (per-node tail, per-node loss sum, system losses)."""
+        return {
+            "tail": self.tail,
+            "total": self.total,
+            "system_losses": np.concatenate(self.system_losses) if self.system_losses else np.empty(0),
+            "count": self.count
+        }
+
+    def merge(self, partial: Dict):
+        """Folds in another accumulator's partial(); only bounded arrays are merged."""
+        self.tail = self._merge(self.tail, partial["tail"])
+        self.system_tail = self._merge(self.system_tail, partial["system_losses"])
+        self.system_losses.append(partial["system_losses"])
+        self.total += partial["total"]
+        self.count += partial["count"]
+
+    @staticmethod
+    def _var_es(tail: np.ndarray, k: int):
+        """VaR = k-th largest loss, ES = mean of the k largest losses."""
+        k = min(k, tail.shape[-1])
+        if k == 0:
+            return np.zeros(tail.shape[:-1]), np.zeros(tail.shape[:-1])
+        top = np.sort(tail, axis=-1)[..., -k:]
+        return top[..., 0], top.mean(axis=-1)
+
+    def finalize(self, quantile: float) -> Dict:
+        k = max(1, math.ceil((1.0 - quantile) * self.count))
+        node_var, node_es = self._var_es(self.tail, k)
+        system_var, system_es = self._var_es(self.system_tail, k)
+        return {
+            "scenarios": self.count,
+            "quantile": quantile,
+            "node_expected_loss": self.total / max(self.count, 1),
+            "node_var": node_var,
+            "node_es": node_es,
+            "system_expected_loss": float(sum(s.sum() for s in self.system_losses)) / max(self.count, 1),
+            "system_var": float(system_var),
+            "system_es": float(system_es)
+        }
+
+class MonteCarloStressTester:
+    """
+    Runs thousands of random / correlated shock scenarios through the CascadeSimulator.
+    Scenarios are split into chunks with independent child seeds (SeedSequence.spawn),
+    so results are reproducible for a given seed regardless of the worker count.
+    Each worker reduces its chunk to a bounded partial tail; the parent only merges them.
+    Chunks are sized against the graph so one chunk stays within `max_chunk_cells`
+    loss values (n_nodes x scenarios) however large the network is.
+    """
+
+    def __init__(self, cascade_params: Optional[Dict] = None, n_scenarios: int = 1000,
+                 quantile: float = 0.99, chunk_size: int = 256, max_chunk_cells: int = 1 << 25,
+                 workers: Optional[int] = None, seed: int = 42, **scenario_params):
+        self.logger = logging.getLogger("StressTester")
+        self.cascade_params = cascade_params or {}
+        self.n_scenarios = n_scenarios
+        self.quantile = quantile
+        self.chunk_size = chunk_size
+        self.max_chunk_cells = max_chunk_cells
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+        self.scenario_params = scenario_params
+
+    def run(self, sparse_graph: SparseGraph) -> Dict:
+        n = sparse_graph.number_of_nodes
+        chunk_size = max(1, min(self.chunk_size, self.max_chunk_cells // max(n, 1)))
+        counts = [min(chunk_size, self.n_scenarios - s) for s in range(0, self.n_scenarios, chunk_size)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(counts))
+
+        tail_size = math.ceil((1.0 - self.quantile) * self.n_scenarios)
+        tasks = [(seed, count, tail_size) for seed, count in zip(seeds, counts)]
+        accumulator = TailAccumulator(n, tail_size)
+        init_args = (sparse_graph.nodes, sparse_graph.adjacency, self.cascade_params, self.scenario_params)
+
+        workers = max(1, min(self.workers, len(tasks)))
+        self.logger.info(f"🎲 Running {self.n_scenarios} stress scenarios "
+                         f"({self.scenario_params.get('kind', 'correlated')}) in chunks of {chunk_size} "
+                         f"on {workers} worker(s)...")
+
+        if workers == 1:
+            _init_worker(*init_args)
+            for task in tasks:
+                accumulator.merge(_run_chunk(task))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+                # map() yields in submission order, keeping the aggregation deterministic
+                for partial in pool.map(_run_chunk, tasks):
+                    accumulator.merge(partial)
+
+        results = accumulator.finalize(self.quantile)
+        results["nodes"] = sparse_graph.nodes
+        self.logger.info(f"✅ Stress test done. System VaR{self.quantile:.0%}: {results['system_var']:,.2f} | "
+                         f"ES: {results['system_es']:,.2f}")
+        return results